@@ -2,9 +2,11 @@ import requests
 import asyncio
 import aiohttp
 import base64
+from collections import defaultdict
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import time
+import threading
 import logging
 from config import Config
 
@@ -28,25 +30,58 @@ class CursorAPIClient:
             'Content-Type': 'application/json',
             'User-Agent': 'CursorAdminDashboard/1.0'
         }
+        
+        # Keep-alive connection pool shared by every synchronous call, sized for the concurrent fetches
+        self.http_session = requests.Session()
+        self.http_session.headers.update(self.headers)
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=Config.MAX_CONCURRENT_REQUESTS,
+            pool_maxsize=Config.MAX_CONCURRENT_REQUESTS
+        )
+        self.http_session.mount('https://', adapter)
+        self.http_session.mount('http://', adapter)
+        
+        # One request start per RATE_LIMIT_DELAY across every thread using this client
+        self._rate_limit_lock = threading.Lock()
+        self._next_request_at = 0.0
+        
+        # Set when the member list falls back to mock users, so only those users get mock usage
+        self.using_mock_members = False
+    
+    def _wait_for_rate_limit(self):
+        """Reserve the next request slot and sleep until it comes up"""
+        with self._rate_limit_lock:
+            now = time.monotonic()
+            start_at = max(now, self._next_request_at)
+            self._next_request_at = start_at + Config.RATE_LIMIT_DELAY
+        if start_at > now:
+            time.sleep(start_at - now)
     
     def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Make a synchronous HTTP request to the API"""
         url = f"{self.base_url.rstrip('/')}/{endpoint.lstrip('/')}"
         
         try:
-            # Add rate limiting
-            time.sleep(Config.RATE_LIMIT_DELAY)
-            
-            response = requests.request(
-                method=method,
-                url=url,
-                headers=self.headers,
-                timeout=Config.API_TIMEOUT,
-                **kwargs
-            )
-            
-            response.raise_for_status()
-            return response.json()
+            for attempt in range(Config.MAX_RETRIES + 1):
+                self._wait_for_rate_limit()
+                
+                response = self.http_session.request(
+                    method=method,
+                    url=url,
+                    timeout=Config.API_TIMEOUT,
+                    **kwargs
+                )
+                
+                # Back off and retry when throttled or when the server fails, honouring Retry-After
+                if response.status_code in Config.RETRY_STATUS_CODES and attempt < Config.MAX_RETRIES:
+                    retry_after = response.headers.get('Retry-After', '')
+                    delay = float(retry_after) if retry_after.isdigit() else Config.RATE_LIMIT_DELAY * 2 ** (attempt + 1)
+                    logger.warning(f"API returned {response.status_code} for {endpoint}, retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                    continue
+                
+                response.raise_for_status()
+                return response.json()
             
         except requests.exceptions.RequestException as e:
             logger.error(f"API request failed: {e}")
@@ -77,9 +112,11 @@ class CursorAPIClient:
         """Get list of team members"""
         try:
             response = self._make_request('GET', '/teams/members')
+            self.using_mock_members = False
             return response.get('members', [])
         except Exception as e:
             logger.warning(f"Failed to fetch team members, using mock data: {e}")
+            self.using_mock_members = True
             return self._generate_mock_users()
     
     def get_daily_usage_data(self, start_date: datetime = None, end_date: datetime = None) -> Dict[str, Any]:
@@ -99,6 +136,45 @@ class CursorAPIClient:
     def get_usage_events(self, start_date: datetime = None, end_date: datetime = None, 
                         email: str = None, page: int = 1, page_size: int = 10) -> Dict[str, Any]:
         """Get detailed usage events"""
+        payload = self._usage_events_payload(start_date, end_date, email, page, page_size)
+        
+        try:
+            return self._make_request('POST', '/teams/filtered-usage-events', json=payload)
+        except Exception as e:
+            logger.warning(f"Failed to fetch usage events, using mock data: {e}")
+            return self._generate_mock_usage_events()
+    
+    async def get_all_usage_events(self, start_date: datetime = None, end_date: datetime = None,
+                                   email: str = None, page_size: int = 1000) -> Dict[str, Any]:
+        """Get every page of usage events, fetching the pages after the first concurrently"""
+        first_page = self.get_usage_events(start_date, end_date, email, page=1, page_size=page_size)
+        num_pages = first_page.get('pagination', {}).get('numPages', 1)
+        if num_pages <= 1:
+            return first_page
+        
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(Config.MAX_CONCURRENT_REQUESTS)
+        
+        async def fetch(page: int) -> Dict[str, Any]:
+            payload = self._usage_events_payload(start_date, end_date, email, page, page_size)
+            async with semaphore:
+                return await loop.run_in_executor(
+                    None, lambda: self._make_request('POST', '/teams/filtered-usage-events', json=payload)
+                )
+        
+        pages = await asyncio.gather(*(fetch(page) for page in range(2, num_pages + 1)), return_exceptions=True)
+        
+        events = list(first_page.get('usageEvents', []))
+        for page, result in enumerate(pages, start=2):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to fetch usage events page {page}: {result}")
+            else:
+                events.extend(result.get('usageEvents', []))
+        return {**first_page, 'usageEvents': events}
+    
+    def _usage_events_payload(self, start_date: datetime = None, end_date: datetime = None,
+                              email: str = None, page: int = 1, page_size: int = 10) -> Dict[str, Any]:
+        """Build the request body for the filtered usage events endpoint"""
         payload = {
             'page': page,
             'pageSize': page_size
@@ -109,12 +185,7 @@ class CursorAPIClient:
             payload['endDate'] = int(end_date.timestamp() * 1000)
         if email:
             payload['email'] = email
-        
-        try:
-            return self._make_request('POST', '/teams/filtered-usage-events', json=payload)
-        except Exception as e:
-            logger.warning(f"Failed to fetch usage events, using mock data: {e}")
-            return self._generate_mock_usage_events()
+        return payload
     
     def get_spending_data(self, start_date: datetime = None, end_date: datetime = None) -> Dict[str, Any]:
         """Get spending data for the team"""
@@ -159,31 +230,56 @@ class CursorAPIClient:
         """Get all users (alias for team members)"""
         return self.get_team_members()
     
-    def get_user_usage(self, user_id: str, start_date: datetime = None, end_date: datetime = None) -> Dict[str, Any]:
-        """Get usage metrics for a specific user"""
-        # Get user email from team members first
-        members = self.get_team_members()
-        user_email = None
-        
-        for member in members:
-            if member.get('id') == user_id or member.get('userId') == user_id:
-                user_email = member.get('email')
-                break
-        
+    def get_user_usage(self, user_id: str, start_date: datetime = None, end_date: datetime = None,
+                       user_email: str = None) -> Dict[str, Any]:
+        """Get usage metrics for a specific user, raising if their usage events cannot be fetched"""
+        # Look the email up from team members unless the caller already has it
         if not user_email:
+            user_email = self.member_emails(self.get_team_members()).get(user_id)
+        
+        if not user_email or self.using_mock_members:
             return self._generate_mock_user_usage(user_id)
         
-        # Get usage events for this user
-        usage_events = self.get_usage_events(
-            start_date=start_date, 
-            end_date=end_date, 
-            email=user_email,
-            page_size=100
-        )
+        # Get usage events for this user; failures propagate so real users never get mock numbers
+        payload = self._usage_events_payload(start_date, end_date, user_email, page_size=100)
+        usage_events = self._make_request('POST', '/teams/filtered-usage-events', json=payload)
         
         # Process usage events into user usage format
         return self._process_user_usage_from_events(user_email, usage_events)
     
+    def member_emails(self, members: List[Dict[str, Any]]) -> Dict[Any, str]:
+        """Map both the id and userId of each team member to their email"""
+        emails = {}
+        for member in members:
+            for key in ('userId', 'id'):
+                if member.get(key) is not None:
+                    emails[member[key]] = member.get('email')
+        return emails
+    
+    async def get_bulk_user_usage(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get usage metrics for many users, overlapping the requests in worker threads"""
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(Config.MAX_CONCURRENT_REQUESTS)
+        
+        # Fetch the member list once instead of once per user
+        emails = self.member_emails(self.get_team_members())
+        
+        async def fetch(user_id: str) -> Dict[str, Any]:
+            async with semaphore:
+                return await loop.run_in_executor(
+                    None, lambda: self.get_user_usage(user_id, user_email=emails.get(user_id))
+                )
+        
+        results = await asyncio.gather(*(fetch(user_id) for user_id in user_ids), return_exceptions=True)
+        
+        usage_data = {}
+        for user_id, result in zip(user_ids, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to get usage for user {user_id}: {result}")
+            else:
+                usage_data[user_id] = result
+        return usage_data
+    
     def get_organization_usage(self, start_date: datetime = None, end_date: datetime = None) -> Dict[str, Any]:
         """Get organization-wide usage metrics"""
         daily_usage = self.get_daily_usage_data(start_date, end_date)
@@ -210,27 +306,25 @@ class CursorAPIClient:
             for event in events
         )
         
-        # Group by date for daily breakdown
-        daily_usage = {}
+        # Group by date for daily breakdown; one dict lookup per event
+        daily_usage = defaultdict(lambda: {
+            'total_requests': 0,
+            'total_tokens': 0,
+            'chat_requests': 0,
+            'composer_requests': 0
+        })
         for event in events:
             timestamp = int(event.get('timestamp', 0))
             date = datetime.fromtimestamp(timestamp / 1000).strftime('%Y-%m-%d')
+            day = daily_usage[date]
             
-            if date not in daily_usage:
-                daily_usage[date] = {
-                    'total_requests': 0,
-                    'total_tokens': 0,
-                    'chat_requests': 0,
-                    'composer_requests': 0
-                }
-            
-            daily_usage[date]['total_requests'] += 1
-            daily_usage[date]['total_tokens'] += event.get('tokenUsage', {}).get('totalCents', 0) * 100
+            day['total_requests'] += 1
+            day['total_tokens'] += event.get('tokenUsage', {}).get('totalCents', 0) * 100
             
             if event.get('kindLabel') == 'Usage-based':
-                daily_usage[date]['chat_requests'] += 1
+                day['chat_requests'] += 1
             else:
-                daily_usage[date]['composer_requests'] += 1
+                day['composer_requests'] += 1
         
         return {
             'user_id': user_email,
@@ -507,5 +601,6 @@ class CursorAPIClient:
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
+        self.http_session.close()
         if self.session:
             asyncio.create_task(self.session.close()) 
\ No newline at end of file
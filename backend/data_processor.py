@@ -11,6 +11,9 @@ logger = logging.getLogger(__name__)
 class DataProcessor:
     """Process and analyze Cursor usage data"""
     
+    # Placeholder for daily usage rows that arrive without an email
+    UNKNOWN_EMAIL = 'unknown@email.com'
+    
     def __init__(self):
         self.users_df = None
         self.usage_df = None
@@ -60,8 +63,8 @@ class DataProcessor:
             else:
                 df['days_since_active'] = 1  # Default
             
-            # Categorize users by activity
-            df['activity_level'] = df['days_since_active'].apply(self._categorize_activity)
+            # Categorize users by activity, as a categorical so filters compare codes
+            df['activity_level'] = self._categorize_activity_levels(df['days_since_active'])
             
             self.users_df = df
             return df
@@ -99,27 +102,9 @@ class DataProcessor:
                 for feature, count in feature_usage.items():
                     row[f'feature_{feature}'] = count
                 
-                # Calculate derived metrics
-                row['requests_per_session'] = (
-                    row['total_requests'] / row['total_sessions'] 
-                    if row['total_sessions'] > 0 else 0
-                )
-                row['tokens_per_request'] = (
-                    row['total_tokens'] / row['total_requests'] 
-                    if row['total_requests'] > 0 else 0
-                )
-                row['activity_score'] = self._calculate_activity_score(row)
-                
                 processed_data.append(row)
             
-            df = pd.DataFrame(processed_data)
-            
-            if not df.empty:
-                # Add percentile rankings
-                numeric_cols = ['total_sessions', 'total_requests', 'total_tokens', 'activity_score']
-                for col in numeric_cols:
-                    if col in df.columns:
-                        df[f'{col}_percentile'] = df[col].rank(pct=True) * 100
+            df = self.process_usage_frame(pd.DataFrame(processed_data))
             
             self.usage_df = df
             return df
@@ -128,6 +113,33 @@ class DataProcessor:
             logger.error(f"Error processing usage data: {e}")
             return pd.DataFrame()
     
+    def process_usage_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Add derived metrics, activity scores and percentiles to a frame of per-user usage metrics"""
+        try:
+            if df.empty:
+                return df
+            
+            # Per-user counts fit in int32; token totals stay int64 since they can pass 2**31
+            count_cols = [
+                col for col in df.columns
+                if (col in ('total_sessions', 'total_requests', 'unique_days_active') or col.startswith('feature_'))
+                and pd.api.types.is_integer_dtype(df[col])
+            ]
+            df = df.astype({col: 'int32' for col in count_cols})
+            
+            # Calculate derived metrics
+            df['requests_per_session'] = (df['total_requests'] / df['total_sessions'].where(df['total_sessions'] > 0)).fillna(0)
+            df['tokens_per_request'] = (df['total_tokens'] / df['total_requests'].where(df['total_requests'] > 0)).fillna(0)
+            df['activity_score'] = self._calculate_activity_scores(df)
+            
+            # Add percentile rankings in one block rather than one column insert at a time
+            numeric_cols = [col for col in ['total_sessions', 'total_requests', 'total_tokens', 'activity_score'] if col in df.columns]
+            return df.join(df[numeric_cols].rank(pct=True).mul(100).add_suffix('_percentile'))
+        
+        except Exception as e:
+            logger.error(f"Error processing usage frame: {e}")
+            return pd.DataFrame()
+    
     def process_daily_usage_data(self, daily_usage_data: Dict[str, Any]) -> pd.DataFrame:
         """Process daily usage data to extract premium requests, model usage, and other metrics"""
         try:
@@ -155,7 +167,7 @@ class DataProcessor:
             # String columns
             for col, default in [
                 ('mostUsedModel', 'unknown'), ('applyMostUsedExtension', '.unknown'), 
-                ('tabMostUsedExtension', '.unknown'), ('email', 'unknown@email.com')
+                ('tabMostUsedExtension', '.unknown'), ('email', self.UNKNOWN_EMAIL)
             ]:
                 if col not in df.columns:
                     df[col] = default
@@ -178,6 +190,18 @@ class DataProcessor:
                 (df['totalTabsAccepted'] / df['totalTabsShown'].replace(0, 1))
             )
             
+            # Shrink the request counts to the narrowest integer type their values fit; counts left float by fillna are included
+            for col in [
+                'subscriptionIncludedReqs', 'usageBasedReqs', 'apiKeyReqs', 'chatRequests', 'composerRequests',
+                'totalAccepts', 'totalApplies', 'totalTabsAccepted', 'totalTabsShown', 'subscription_requests',
+                'usage_based_requests', 'api_key_requests', 'total_premium_requests', 'total_requests'
+            ]:
+                df[col] = pd.to_numeric(df[col], downcast='integer')
+            
+            # Dictionary-encode the string keys the views group on
+            for col in ['email', 'primary_model']:
+                df[col] = df[col].astype('category')
+            
             return df
             
         except Exception as e:
@@ -223,6 +247,25 @@ class DataProcessor:
             df['model_used'] = df.get('model', 'unknown')
             df['is_max_mode'] = df.get('maxMode', False)
             
+            # Keep the numeric analysis columns in narrow Arrow buffers and dictionary-encode emails and models
+            # (categoricals rather than Arrow dictionaries, which pandas cannot read back from Parquet)
+            df['is_max_mode'] = df['is_max_mode'].fillna(False)
+            df = df.astype({
+                'cost_cents': 'double[pyarrow]',  # Fractional cents
+                'input_tokens': 'int32[pyarrow]',
+                'output_tokens': 'int32[pyarrow]',
+                'cache_write_tokens': 'int32[pyarrow]',
+                'cache_read_tokens': 'int32[pyarrow]',
+                'is_max_mode': 'bool[pyarrow]'
+            })
+            
+            # Derived per-event columns, so aggregations only need sums
+            df['cost_dollars'] = df['cost_cents'] / 100
+            df['event_tokens'] = df['input_tokens'] + df['output_tokens']
+            for column in ['userEmail', 'model_used']:
+                if column in df.columns:
+                    df[column] = df[column].astype('category')
+            
             return df
             
         except Exception as e:
@@ -248,6 +291,48 @@ class DataProcessor:
             logger.error(f"Error processing spending data: {e}")
             return {}
     
+    def aggregate_daily_usage_by_user(self, daily_usage_df: pd.DataFrame) -> pd.DataFrame:
+        """Aggregate processed daily usage into per-user request totals, activity and last seen date"""
+        try:
+            if daily_usage_df is None or daily_usage_df.empty:
+                return pd.DataFrame()
+            
+            # Rows without a real email (missing, empty or the placeholder filled in on processing) are no user
+            emails = daily_usage_df['email']
+            daily_usage_df = daily_usage_df[emails.notna() & ~emails.isin(['', self.UNKNOWN_EMAIL])]
+            
+            if 'isActive' in daily_usage_df.columns:
+                is_active = daily_usage_df['isActive'].fillna(False).astype(bool)
+            else:
+                is_active = pd.Series(False, index=daily_usage_df.index)
+            
+            # One pass per column over the factorized emails instead of a hash groupby
+            codes, emails = pd.factorize(daily_usage_df['email'])
+            n_users = len(emails)
+            
+            def per_user_sum(values):
+                return np.bincount(codes, weights=np.asarray(values, dtype=np.float64), minlength=n_users).astype(np.int64)
+            
+            active_days = per_user_sum(is_active)
+            total_requests = per_user_sum(daily_usage_df['total_requests'])
+            last_seen = np.full(n_users, np.iinfo(np.int64).min, dtype=np.int64)  # NaT
+            np.maximum.at(last_seen, codes, daily_usage_df['date'].to_numpy('datetime64[ns]').view(np.int64))
+            
+            return pd.DataFrame({
+                'total_sessions': np.bincount(codes, minlength=n_users),
+                'total_requests': total_requests,
+                'total_chat_requests': per_user_sum(daily_usage_df['chatRequests']),
+                'total_composer_requests': per_user_sum(daily_usage_df['composerRequests']),
+                'total_tokens': total_requests * Config.ESTIMATED_TOKENS_PER_REQUEST,  # Estimated per user, not per day
+                'is_active': active_days > 0,
+                'unique_days_active': active_days,
+                'last_seen': last_seen.view('datetime64[ns]')
+            }, index=pd.Index(emails, name='email'))
+        
+        except Exception as e:
+            logger.error(f"Error aggregating daily usage by user: {e}")
+            return pd.DataFrame()
+    
     def get_premium_requests_analysis(self, daily_usage_df: pd.DataFrame) -> Dict[str, Any]:
         """Analyze premium vs subscription requests"""
         try:
@@ -255,12 +340,9 @@ class DataProcessor:
                 return {}
             
             # Group by user email
-            user_premium_analysis = daily_usage_df.groupby('email').agg({
-                'subscription_requests': 'sum',
-                'usage_based_requests': 'sum', 
-                'api_key_requests': 'sum',
-                'total_premium_requests': 'sum'
-            }).reset_index()
+            user_premium_analysis = daily_usage_df.groupby('email', observed=True)[[
+                'subscription_requests', 'usage_based_requests', 'api_key_requests', 'total_premium_requests'
+            ]].sum().reset_index()
             
             # Calculate percentages
             total_subscription = user_premium_analysis['subscription_requests'].sum()
@@ -306,19 +388,12 @@ class DataProcessor:
             if usage_events_df.empty:
                 return {}
             
-            # Group by user email
-            user_spending = usage_events_df.groupby('userEmail').agg({
-                'cost_cents': 'sum',
-                'input_tokens': 'sum',
-                'output_tokens': 'sum',
-                'cache_write_tokens': 'sum',
-                'cache_read_tokens': 'sum',
-                'is_premium': 'sum',
-                'is_subscription': 'sum'
-            }).reset_index()
-            
-            # Convert cents to dollars
-            user_spending['cost_dollars'] = user_spending['cost_cents'] / 100
+            # Single pass per column over the factorized user emails
+            user_spending = self.aggregate_events_by_user(usage_events_df, [
+                'cost_cents', 'cost_dollars', 'input_tokens', 'output_tokens',
+                'cache_write_tokens', 'cache_read_tokens', 'is_premium', 'is_subscription'
+            ]).reset_index()
+            
             user_spending['total_tokens'] = (
                 user_spending['input_tokens'] + 
                 user_spending['output_tokens'] + 
@@ -361,7 +436,7 @@ class DataProcessor:
             
             # Daily usage model analysis
             if not daily_usage_df.empty:
-                model_daily_usage = daily_usage_df.groupby(['email', 'primary_model']).size().reset_index(name='days_used')
+                model_daily_usage = daily_usage_df.groupby(['email', 'primary_model'], observed=True).size().reset_index(name='days_used')
                 model_popularity = daily_usage_df['primary_model'].value_counts().to_dict()
                 
                 analysis['daily_model_usage'] = {
@@ -371,33 +446,21 @@ class DataProcessor:
             
             # Usage events model analysis (more detailed)
             if not usage_events_df.empty:
-                model_events = usage_events_df.groupby(['userEmail', 'model_used']).agg({
-                    'cost_cents': 'sum',
-                    'input_tokens': 'sum',
-                    'output_tokens': 'sum',
-                    'is_max_mode': 'sum'
-                }).reset_index()
-                
-                model_events['cost_dollars'] = model_events['cost_cents'] / 100
+                model_events = usage_events_df.groupby(['userEmail', 'model_used'], observed=True)[[
+                    'cost_cents', 'cost_dollars', 'input_tokens', 'output_tokens', 'is_max_mode'
+                ]].sum().reset_index()
                 
                 # Model cost analysis
-                model_costs = usage_events_df.groupby('model_used').agg({
-                    'cost_cents': ['sum', 'mean', 'count'],
-                    'input_tokens': 'sum',
-                    'output_tokens': 'sum'
-                }).round(4)
-                
-                model_costs.columns = ['total_cost_cents', 'avg_cost_cents', 'request_count', 'total_input_tokens', 'total_output_tokens']
-                model_costs['total_cost_dollars'] = model_costs['total_cost_cents'] / 100
-                model_costs['avg_cost_dollars'] = model_costs['avg_cost_cents'] / 100
+                model_costs = self.aggregate_events_by_model(usage_events_df).drop(columns='max_mode_count').round(4)
+                model_costs[['total_cost_dollars', 'avg_cost_dollars']] = model_costs[['total_cost_cents', 'avg_cost_cents']].to_numpy(dtype=np.float64) / 100
                 
                 analysis['detailed_model_usage'] = {
                     'user_model_costs': model_events.to_dict('records'),
                     'model_cost_breakdown': model_costs.reset_index().to_dict('records'),
                     'model_performance': {
-                        'most_expensive': model_costs.loc[model_costs['total_cost_dollars'].idxmax()].to_dict() if len(model_costs) > 0 else {},
-                        'most_used': model_costs.loc[model_costs['request_count'].idxmax()].to_dict() if len(model_costs) > 0 else {},
-                        'highest_avg_cost': model_costs.loc[model_costs['avg_cost_dollars'].idxmax()].to_dict() if len(model_costs) > 0 else {}
+                        'most_expensive': model_costs.nlargest(1, 'total_cost_dollars').iloc[0].to_dict() if len(model_costs) > 0 else {},
+                        'most_used': model_costs.nlargest(1, 'request_count').iloc[0].to_dict() if len(model_costs) > 0 else {},
+                        'highest_avg_cost': model_costs.nlargest(1, 'avg_cost_dollars').iloc[0].to_dict() if len(model_costs) > 0 else {}
                     }
                 }
             
@@ -407,6 +470,41 @@ class DataProcessor:
             logger.error(f"Error analyzing model usage: {e}")
             return {}
     
+    def aggregate_events_by_user(self, usage_events_df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+        """Sum the given event columns per user in one bincount pass each"""
+        codes, emails = pd.factorize(usage_events_df['userEmail'], sort=True)
+        totals = self._bincount_sums(codes, len(emails), usage_events_df, columns)
+        return pd.DataFrame(totals, index=pd.Index(emails, name='userEmail'))
+    
+    def aggregate_events_by_model(self, usage_events_df: pd.DataFrame) -> pd.DataFrame:
+        """Aggregate cost, token and max mode totals per model in one pass over the events"""
+        codes, models = pd.factorize(usage_events_df['model_used'], sort=True)
+        request_count = np.bincount(codes[codes >= 0], minlength=len(models))
+        totals = self._bincount_sums(codes, len(models), usage_events_df, ['cost_cents', 'input_tokens', 'output_tokens', 'is_max_mode'])
+        
+        return pd.DataFrame({
+            'total_cost_cents': totals['cost_cents'],
+            'avg_cost_cents': totals['cost_cents'] / request_count,
+            'request_count': request_count,
+            'total_input_tokens': totals['input_tokens'],
+            'total_output_tokens': totals['output_tokens'],
+            'max_mode_count': totals['is_max_mode']
+        }, index=pd.Index(models, name='model_used'))
+    
+    def _bincount_sums(self, codes: np.ndarray, n: int, df: pd.DataFrame, columns: List[str]) -> Dict[str, np.ndarray]:
+        """Sum each column of df per factorized code, skipping null keys; integer and bool columns stay integer"""
+        valid = codes >= 0
+        codes = codes[valid]
+        
+        totals = {}
+        for column in columns:
+            # na_value=0 is rejected for bool[pyarrow] columns, so nulls go through NaN to 0
+            values = np.nan_to_num(df[column].to_numpy(dtype=np.float64, na_value=np.nan)[valid])
+            column_sum = np.bincount(codes, weights=values, minlength=n)
+            is_count = pd.api.types.is_integer_dtype(df[column]) or pd.api.types.is_bool_dtype(df[column])
+            totals[column] = column_sum.astype(np.int64) if is_count else column_sum
+        return totals
+    
     def get_top_users(self, metric: str = 'total_requests', top_n: int = 10) -> pd.DataFrame:
         """Get top N users by specified metric"""
         if self.usage_df is None or self.usage_df.empty:
@@ -581,19 +679,17 @@ class DataProcessor:
         
         return metrics
     
-    def _categorize_activity(self, days_since_active: int) -> str:
-        """Categorize user activity level based on days since last active"""
-        if days_since_active <= 1:
-            return 'Very Active'
-        elif days_since_active <= 7:
-            return 'Active'
-        elif days_since_active <= 30:
-            return 'Moderately Active'
-        else:
-            return 'Inactive'
+    def _categorize_activity_levels(self, days_since_active: pd.Series) -> pd.Series:
+        """Categorize each user's activity level based on days since last active"""
+        levels = pd.cut(
+            days_since_active,
+            bins=[-np.inf, 1, 7, 30, np.inf],
+            labels=['Very Active', 'Active', 'Moderately Active', 'Inactive']
+        )
+        return levels.fillna('Inactive')
     
-    def _calculate_activity_score(self, user_data: Dict) -> float:
-        """Calculate a composite activity score for a user"""
+    def _calculate_activity_scores(self, usage_df: pd.DataFrame) -> pd.Series:
+        """Calculate a composite activity score for each user"""
         # Weighted scoring based on different metrics
         weights = {
             'sessions': 0.2,
@@ -604,11 +700,11 @@ class DataProcessor:
         }
         
         # Normalize metrics (simple min-max approach)
-        normalized_sessions = min(user_data['total_sessions'] / 100, 1.0)
-        normalized_requests = min(user_data['total_requests'] / 1000, 1.0)
-        normalized_tokens = min(user_data['total_tokens'] / 100000, 1.0)
-        normalized_days = min(user_data['unique_days_active'] / 30, 1.0)
-        normalized_duration = min(user_data['avg_session_duration'] / 300, 1.0)
+        normalized_sessions = (usage_df['total_sessions'] / 100).clip(upper=1.0)
+        normalized_requests = (usage_df['total_requests'] / 1000).clip(upper=1.0)
+        normalized_tokens = (usage_df['total_tokens'] / 100000).clip(upper=1.0)
+        normalized_days = (usage_df['unique_days_active'] / 30).clip(upper=1.0)
+        normalized_duration = (usage_df['avg_session_duration'] / 300).clip(upper=1.0)
         
         score = (
             normalized_sessions * weights['sessions'] +
@@ -618,7 +714,7 @@ class DataProcessor:
             normalized_duration * weights['avg_duration']
         ) * 100
         
-        return round(score, 2)
+        return score.round(2)
     
     def _get_segment_top_features(self, segment_data: pd.DataFrame) -> List[Tuple[str, float]]:
         """Get top features for a user segment"""
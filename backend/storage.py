@@ -1,3 +1,4 @@
+import io
 import json
 import csv
 import os
@@ -74,6 +75,61 @@ class DataStorage:
             logger.error(f"Failed to load usage data: {e}")
             return None
     
+    def save_spending_data(self, spending_data: Optional[Dict[str, Any]]) -> bool:
+        """Save processed spending data to its own file, leaving the shared cache timestamp alone"""
+        try:
+            with open(Config.SPENDING_FILE, 'w') as f:
+                json.dump({
+                    'timestamp': datetime.now().isoformat(),
+                    'spending': spending_data
+                }, f, indent=2)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save spending data: {e}")
+            return False
+    
+    def load_spending_data(self) -> Optional[Dict[str, Any]]:
+        """Load processed spending data from file"""
+        try:
+            if not os.path.exists(Config.SPENDING_FILE):
+                return None
+            
+            with open(Config.SPENDING_FILE, 'r') as f:
+                return json.load(f).get('spending')
+        except Exception as e:
+            logger.error(f"Failed to load spending data: {e}")
+            return None
+    
+    def save_dataframe(self, dataframe: pd.DataFrame, file_path: str) -> bool:
+        """Save a processed DataFrame to a Parquet file"""
+        try:
+            dataframe.to_parquet(file_path, compression='zstd', index=False)
+            logger.info(f"Saved {len(dataframe)} rows to {file_path}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save {file_path}: {e}")
+            return False
+    
+    def load_dataframe(self, file_path: str, columns: List[str] = None) -> Optional[pd.DataFrame]:
+        """Load a processed DataFrame from a Parquet file"""
+        try:
+            if not os.path.exists(file_path):
+                return None
+            
+            return pd.read_parquet(file_path, columns=columns, engine='pyarrow', memory_map=True)
+        except Exception as e:
+            logger.error(f"Failed to load {file_path}: {e}")
+            return None
+    
+    def is_file_fresh(self, file_path: str, max_age_minutes: int = None) -> bool:
+        """Check if a data file exists and was written within the refresh interval"""
+        max_age = max_age_minutes or Config.REFRESH_INTERVAL_MINUTES
+        try:
+            age = datetime.now().timestamp() - os.path.getmtime(file_path)
+            return age / 60 <= max_age
+        except OSError:
+            return False
+    
     def save_cache(self, cache_data: Dict[str, Any]) -> bool:
         """Save general cache data"""
         try:
@@ -181,81 +237,7 @@ class DataStorage:
             file_path = os.path.join(Config.EXPORTS_DIR, filename)
             
             with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                # Users overview
-                if not users_df.empty:
-                    users_df.to_excel(writer, sheet_name='Users', index=False)
-                
-                # Usage metrics
-                if not usage_df.empty:
-                    usage_df.to_excel(writer, sheet_name='Usage_Metrics', index=False)
-                
-                # Top users by various metrics
-                if not usage_df.empty:
-                    top_users_sessions = usage_df.nlargest(20, 'total_sessions')[
-                        ['user_id', 'total_sessions', 'total_requests', 'total_tokens']
-                    ]
-                    top_users_sessions.to_excel(writer, sheet_name='Top_Users_Sessions', index=False)
-                    
-                    top_users_requests = usage_df.nlargest(20, 'total_requests')[
-                        ['user_id', 'total_sessions', 'total_requests', 'total_tokens']
-                    ]
-                    top_users_requests.to_excel(writer, sheet_name='Top_Users_Requests', index=False)
-                
-                # Feature usage analysis
-                if analytics_data and 'feature_analysis' in analytics_data:
-                    feature_data = analytics_data['feature_analysis']
-                    if 'total_usage' in feature_data:
-                        feature_df = pd.DataFrame([
-                            {'feature': k, 'total_usage': v}
-                            for k, v in feature_data['total_usage'].items()
-                        ])
-                        feature_df.to_excel(writer, sheet_name='Feature_Usage', index=False)
-                
-                # User segmentation
-                if analytics_data and 'user_segmentation' in analytics_data:
-                    seg_data = analytics_data['user_segmentation']
-                    seg_df = pd.DataFrame([
-                        {
-                            'segment': k,
-                            'count': v['count'],
-                            'percentage': v['percentage'],
-                            'avg_sessions': v['avg_sessions'],
-                            'avg_requests': v['avg_requests']
-                        }
-                        for k, v in seg_data.items()
-                    ])
-                    seg_df.to_excel(writer, sheet_name='User_Segments', index=False)
-                
-                # Trends data
-                if trends_df is not None and not trends_df.empty:
-                    trends_df.to_excel(writer, sheet_name='Daily_Trends', index=False)
-                
-                # Summary statistics
-                summary_data = {
-                    'metric': [],
-                    'value': []
-                }
-                
-                if not usage_df.empty:
-                    summary_data['metric'].extend([
-                        'Total Users',
-                        'Total Sessions',
-                        'Total Requests',
-                        'Total Tokens',
-                        'Avg Sessions per User',
-                        'Avg Requests per User'
-                    ])
-                    summary_data['value'].extend([
-                        len(usage_df),
-                        usage_df['total_sessions'].sum(),
-                        usage_df['total_requests'].sum(),
-                        usage_df['total_tokens'].sum(),
-                        round(usage_df['total_sessions'].mean(), 2),
-                        round(usage_df['total_requests'].mean(), 2)
-                    ])
-                
-                summary_df = pd.DataFrame(summary_data)
-                summary_df.to_excel(writer, sheet_name='Summary', index=False)
+                self._write_report_sheets(writer, users_df, usage_df, analytics_data, trends_df)
             
             logger.info(f"Created comprehensive report: {file_path}")
             return file_path
@@ -264,6 +246,99 @@ class DataStorage:
             logger.error(f"Failed to create comprehensive report: {e}")
             raise
     
+    def create_comprehensive_report_bytes(self, users_df: pd.DataFrame, usage_df: pd.DataFrame, 
+                                        analytics_data: Dict[str, Any], trends_df: pd.DataFrame = None) -> bytes:
+        """Build the comprehensive Excel report in memory and return the workbook bytes"""
+        try:
+            buffer = io.BytesIO()
+            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+                self._write_report_sheets(writer, users_df, usage_df, analytics_data, trends_df)
+            
+            return buffer.getvalue()
+        
+        except Exception as e:
+            logger.error(f"Failed to create comprehensive report: {e}")
+            raise
+    
+    def _write_report_sheets(self, writer: pd.ExcelWriter, users_df: pd.DataFrame, usage_df: pd.DataFrame,
+                             analytics_data: Dict[str, Any], trends_df: pd.DataFrame = None):
+        """Write the report sheets to an open Excel writer"""
+        # Users overview
+        if not users_df.empty:
+            users_df.to_excel(writer, sheet_name='Users', index=False)
+        
+        # Usage metrics
+        if not usage_df.empty:
+            usage_df.to_excel(writer, sheet_name='Usage_Metrics', index=False)
+        
+        # Top users by various metrics
+        if not usage_df.empty:
+            top_users_sessions = usage_df.nlargest(20, 'total_sessions')[
+                ['user_id', 'total_sessions', 'total_requests', 'total_tokens']
+            ]
+            top_users_sessions.to_excel(writer, sheet_name='Top_Users_Sessions', index=False)
+            
+            top_users_requests = usage_df.nlargest(20, 'total_requests')[
+                ['user_id', 'total_sessions', 'total_requests', 'total_tokens']
+            ]
+            top_users_requests.to_excel(writer, sheet_name='Top_Users_Requests', index=False)
+        
+        # Feature usage analysis
+        if analytics_data and 'feature_analysis' in analytics_data:
+            feature_data = analytics_data['feature_analysis']
+            if 'total_usage' in feature_data:
+                feature_df = pd.DataFrame([
+                    {'feature': k, 'total_usage': v}
+                    for k, v in feature_data['total_usage'].items()
+                ])
+                feature_df.to_excel(writer, sheet_name='Feature_Usage', index=False)
+        
+        # User segmentation
+        if analytics_data and 'user_segmentation' in analytics_data:
+            seg_data = analytics_data['user_segmentation']
+            seg_df = pd.DataFrame([
+                {
+                    'segment': k,
+                    'count': v['count'],
+                    'percentage': v['percentage'],
+                    'avg_sessions': v['avg_sessions'],
+                    'avg_requests': v['avg_requests']
+                }
+                for k, v in seg_data.items()
+            ])
+            seg_df.to_excel(writer, sheet_name='User_Segments', index=False)
+        
+        # Trends data
+        if trends_df is not None and not trends_df.empty:
+            trends_df.to_excel(writer, sheet_name='Daily_Trends', index=False)
+        
+        # Summary statistics
+        summary_data = {
+            'metric': [],
+            'value': []
+        }
+        
+        if not usage_df.empty:
+            summary_data['metric'].extend([
+                'Total Users',
+                'Total Sessions',
+                'Total Requests',
+                'Total Tokens',
+                'Avg Sessions per User',
+                'Avg Requests per User'
+            ])
+            summary_data['value'].extend([
+                len(usage_df),
+                usage_df['total_sessions'].sum(),
+                usage_df['total_requests'].sum(),
+                usage_df['total_tokens'].sum(),
+                round(usage_df['total_sessions'].mean(), 2),
+                round(usage_df['total_requests'].mean(), 2)
+            ])
+        
+        summary_df = pd.DataFrame(summary_data)
+        summary_df.to_excel(writer, sheet_name='Summary', index=False)
+    
     def get_export_files(self) -> List[Dict[str, Any]]:
         """Get list of available export files"""
         try:
@@ -330,13 +405,14 @@ class DataStorage:
         else:
             freshness['users_data'] = {'exists': False}
         
-        # Check usage data
-        if os.path.exists(Config.USAGE_FILE):
-            stat = os.stat(Config.USAGE_FILE)
+        # Check usage data, saved as JSON by the data service and as Parquet by the dashboard
+        usage_files = [path for path in (Config.USAGE_FILE, Config.USAGE_DF_FILE) if os.path.exists(path)]
+        if usage_files:
+            mtime = max(os.stat(path).st_mtime for path in usage_files)
             freshness['usage_data'] = {
                 'exists': True,
-                'last_modified': datetime.fromtimestamp(stat.st_mtime),
-                'age_minutes': (datetime.now() - datetime.fromtimestamp(stat.st_mtime)).total_seconds() / 60
+                'last_modified': datetime.fromtimestamp(mtime),
+                'age_minutes': (datetime.now() - datetime.fromtimestamp(mtime)).total_seconds() / 60
             }
         else:
             freshness['usage_data'] = {'exists': False}
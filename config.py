@@ -24,16 +24,27 @@ class Config:
     CACHE_FILE = os.path.join(DATA_DIR, 'cache.json')
     USERS_FILE = os.path.join(DATA_DIR, 'users.json')
     USAGE_FILE = os.path.join(DATA_DIR, 'usage.json')
+    DAILY_USAGE_FILE = os.path.join(DATA_DIR, 'daily_usage.parquet')
+    USAGE_EVENTS_FILE = os.path.join(DATA_DIR, 'usage_events.parquet')
+    USERS_DF_FILE = os.path.join(DATA_DIR, 'users.parquet')
+    USAGE_DF_FILE = os.path.join(DATA_DIR, 'usage.parquet')
+    SPENDING_FILE = os.path.join(DATA_DIR, 'spending.json')
     
     # API Settings
     API_TIMEOUT = 30
-    RATE_LIMIT_DELAY = 1  # seconds between API calls
-    MAX_RETRIES = 3
+    RATE_LIMIT_DELAY = 1  # minimum seconds between API call starts, shared by all threads of a client
+    MAX_RETRIES = 3  # retries on RETRY_STATUS_CODES, backing off from RATE_LIMIT_DELAY
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+    MAX_CONCURRENT_REQUESTS = int(os.getenv('MAX_CONCURRENT_REQUESTS', 4))  # overlaps latency; the rate stays one call per RATE_LIMIT_DELAY
+    
+    # Usage Estimates
+    ESTIMATED_TOKENS_PER_REQUEST = 1000  # used when the API reports no token counts
     
     # Chart Settings
     DEFAULT_CHART_HEIGHT = 400
     DEFAULT_CHART_WIDTH = 800
     CHART_THEME = 'plotly_white'
+    MAX_CHART_POINTS = 1000  # time series longer than this are downsampled before plotting
     
     @classmethod
     def validate(cls):
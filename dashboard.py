@@ -1,13 +1,16 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import pyarrow as pa
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timedelta
 import logging
 import sys
-import os
 
 # Add backend to path
 sys.path.append('backend')
@@ -24,6 +27,261 @@ logger = logging.getLogger(__name__)
 # Configure Streamlit page
 st.set_page_config(**DASHBOARD_CONFIG)
 
+# Metrics the top users chart can rank by, with their display labels
+TOP_USER_METRICS = ["total_requests", "total_sessions", "total_tokens", "activity_score"]
+METRIC_LABELS = {metric: metric.replace('_', ' ').title() for metric in TOP_USER_METRICS}
+
+# Usage event columns the dashboard aggregates; warm starts read only these from Parquet
+EVENT_COLUMNS = ['userEmail', 'model_used', 'cost_cents', 'input_tokens', 'output_tokens', 'event_tokens', 'is_max_mode']
+
+@st.cache_resource
+def get_api_client(api_key, org_id, base_url):
+    """Create one API client per set of credentials so its HTTP session is reused across reruns"""
+    return CursorAPIClient(api_key=api_key, org_id=org_id, base_url=base_url)
+
+@st.cache_data(ttl=Config.REFRESH_INTERVAL_MINUTES * 60, show_spinner=False)
+def fetch_organization_usage(_api_client):
+    """Fetch organization usage for the trends chart at most once per refresh interval"""
+    return _api_client.get_organization_usage()
+
+def frame_hash(df):
+    """Cache key for a DataFrame covering its shape, values, index and row order"""
+    return df.shape, pd.util.hash_pandas_object(df, index=True).values.tobytes()
+
+@st.cache_data(hash_funcs={pd.DataFrame: lambda df: frame_hash(df[EVENT_COLUMNS])})
+def compute_events_by_user_model(events_df):
+    """Aggregate usage events once per user and model; per-user and per-model views roll this up"""
+    # Arrow's hash aggregate groups on the dictionary-encoded keys without going through pandas' groupby
+    keys = ['userEmail', 'model_used']
+    # Arrow keeps a null key as its own group while pandas dropped it, so drop events without a user or model first
+    table = pa.Table.from_pandas(events_df[EVENT_COLUMNS].dropna(subset=keys), preserve_index=False)
+    grouped = table.group_by(keys).aggregate([
+        ('cost_cents', 'sum'),
+        ('input_tokens', 'sum'),
+        ('output_tokens', 'sum'),
+        ('event_tokens', 'sum'),
+        ('model_used', 'count'),
+        ('is_max_mode', 'sum')
+    ]).to_pandas(types_mapper=lambda t: None if pa.types.is_dictionary(t) else pd.ArrowDtype(t))
+    
+    # Keys come back as categoricals; sums stay nullable so later left joins keep integer totals.
+    # Output columns are renamed by name, since their position relative to the keys varies across pyarrow versions
+    grouped = grouped.rename(columns={
+        'cost_cents_sum': 'cost_cents',
+        'input_tokens_sum': 'input_tokens',
+        'output_tokens_sum': 'output_tokens',
+        'event_tokens_sum': 'event_tokens',
+        'model_used_count': 'requests',
+        'is_max_mode_sum': 'max_mode'
+    })
+    grouped[['requests', 'max_mode']] = grouped[['requests', 'max_mode']].astype(np.int64)
+    return grouped.set_index(keys)[['cost_cents', 'input_tokens', 'output_tokens', 'event_tokens', 'requests', 'max_mode']]
+
+@st.cache_data(hash_funcs={pd.DataFrame: frame_hash})
+def compute_top_premium_users(daily_df, top_n=10):
+    """Total usage-based and subscription requests per user and keep the heaviest usage-based users"""
+    totals = daily_df.groupby('email', observed=True, sort=False)[['usage_based_requests', 'subscription_requests']].sum()
+    return totals.reset_index().nlargest(top_n, 'usage_based_requests')
+
+@st.cache_data(ttl=Config.REFRESH_INTERVAL_MINUTES * 60, max_entries=8, hash_funcs={pd.DataFrame: frame_hash})
+def compute_model_popularity(daily_df):
+    """Rank primary models by the number of user-days they were used, with each model's share"""
+    # Count the category codes in one bincount pass, then rank highest to lowest as value_counts does
+    models = daily_df['primary_model'].astype('category')
+    codes = models.cat.codes.to_numpy()
+    counts = np.bincount(codes[codes >= 0], minlength=len(models.cat.categories))
+    model_popularity = pd.Series(counts, index=pd.Index(models.cat.categories, name='model')).sort_values(ascending=False)
+    model_popularity = model_popularity.reset_index(name='usage_count')
+    model_popularity['rank'] = range(1, len(model_popularity) + 1)
+    model_popularity['percentage'] = (model_popularity['usage_count'] / model_popularity['usage_count'].sum() * 100).round(2)
+    return model_popularity
+
+@st.cache_data(ttl=Config.REFRESH_INTERVAL_MINUTES * 60, max_entries=8, hash_funcs={pd.DataFrame: frame_hash})
+def compute_top_model_users(daily_df, top_n=10):
+    """Total model usage days per user and keep the users with the most days"""
+    # Summing the per (email, model) day counts per email is just counting each email's days with a model,
+    # so one grouped pass does it; keys stay unsorted since the result is ranked straight after
+    days_used = daily_df.loc[daily_df['primary_model'].notna()].groupby('email', observed=True, sort=False).size()
+    return days_used.nlargest(top_n).rename('days_used').reset_index()
+
+@st.cache_data(ttl=Config.REFRESH_INTERVAL_MINUTES * 60, max_entries=8, hash_funcs={pd.DataFrame: frame_hash})
+def compute_model_totals(user_model_view):
+    """Roll the per-user and model aggregate up to the model comparison table"""
+    model_totals = user_model_view.groupby(level='model_used', observed=True).sum()
+    model_analysis = pd.DataFrame({
+        'Total Cost (¢)': model_totals['cost_cents'],
+        'Avg Cost (¢)': model_totals['cost_cents'] / model_totals['requests'],
+        'Requests': model_totals['requests'],
+        'Input Tokens': model_totals['input_tokens'],
+        'Output Tokens': model_totals['output_tokens'],
+        'Max Mode Usage': model_totals['max_mode']
+    }).round(2)
+    
+    # Both dollar columns come from one divide over the rounded cent columns
+    model_analysis[['Total Cost ($)', 'Avg Cost ($)']] = model_analysis[['Total Cost (¢)', 'Avg Cost (¢)']].to_numpy(dtype=np.float64) / 100
+    return model_analysis
+
+def compute_user_spending(events_by_user_model):
+    """Roll the user and model aggregate up to per-user spending and token totals"""
+    user_spending = events_by_user_model.groupby(level='userEmail', observed=True, sort=False).sum().reset_index()
+    # Convert to dollars once per user rather than summing a per-event dollar column
+    user_spending.insert(2, 'cost_dollars', user_spending['cost_cents'] / 100)
+    return user_spending
+
+@lru_cache(maxsize=8192)
+def derive_display_name(email):
+    """Derive a display name from an email's local part, splitting on dots or underscores"""
+    name_part = email.split('@')[0] if '@' in email else email
+    
+    # Convert dots and underscores to spaces and title case
+    if '.' in name_part:
+        return ' '.join(word.capitalize() for word in name_part.split('.'))
+    if '_' in name_part:
+        return ' '.join(word.capitalize() for word in name_part.split('_'))
+    return name_part.capitalize()
+
+@st.cache_data
+def email_display_names(emails):
+    """Map each email to a display name derived from its local part"""
+    return {email: email.split('@', 1)[0].replace('.', ' ').title() for email in emails}
+
+@st.cache_data(hash_funcs={pd.DataFrame: frame_hash})
+def build_bar_chart(data, x, y, title, color_scale, labels=None, show_values=False):
+    """Build a bar chart coloured by its value column, cached on the plotted data"""
+    fig = px.bar(
+        data,
+        x=x,
+        y=y,
+        title=title,
+        color=y,
+        color_continuous_scale=color_scale,
+        labels=labels,
+        text=y if show_values else None
+    )
+    fig.update_layout(xaxis_tickangle=45)
+    if show_values:
+        fig.update_traces(texttemplate='%{text}', textposition='outside')
+    return fig
+
+@st.cache_data(hash_funcs={pd.DataFrame: frame_hash})
+def build_usage_trends_chart(trends_df):
+    """Build the 2x2 usage trends figure, cached on the plotted trend data"""
+    def downsampled(column):
+        """Limit a trend series to Config.MAX_CHART_POINTS rows before it is sent to the browser"""
+        rows = trends_df.iloc[lttb_indices(trends_df[column].to_numpy(), Config.MAX_CHART_POINTS)]
+        return {'x': rows['date'], 'y': rows[column]}
+    
+    fig = make_subplots(
+        rows=2, cols=2,
+        subplot_titles=('Daily Requests', 'Daily Sessions', 'Daily Tokens', 'Active Users'),
+        specs=[[{"secondary_y": False}, {"secondary_y": False}],
+               [{"secondary_y": False}, {"secondary_y": False}]]
+    )
+    
+    # Daily requests
+    fig.add_trace(
+        go.Scattergl(**downsampled('requests'), 
+                      mode='lines+markers', name='Requests'),
+        row=1, col=1
+    )
+    
+    # Daily sessions
+    fig.add_trace(
+        go.Scattergl(**downsampled('sessions'), 
+                      mode='lines+markers', name='Sessions'),
+        row=1, col=2
+    )
+    
+    # Daily tokens
+    fig.add_trace(
+        go.Scattergl(**downsampled('tokens'), 
+                      mode='lines+markers', name='Tokens'),
+        row=2, col=1
+    )
+    
+    # Active users
+    if 'unique_users' in trends_df.columns:
+        fig.add_trace(
+            go.Scattergl(**downsampled('unique_users'), 
+                          mode='lines+markers', name='Active Users'),
+            row=2, col=2
+        )
+    
+    # WebGL traces; unified hover without spike search keeps long histories responsive
+    fig.update_layout(
+        height=600,
+        title_text="Usage Trends Over Time",
+        showlegend=False,
+        hovermode='x unified',
+        spikedistance=0
+    )
+    
+    return fig
+
+@st.cache_data(hash_funcs={pd.DataFrame: frame_hash})
+def build_pie_chart(data, values, names, title):
+    """Build a pie chart, cached on the plotted data"""
+    return px.pie(data, values=values, names=names, title=title)
+
+def lttb_indices(values, n_out):
+    """Pick n_out row positions that preserve a series' shape (Largest-Triangle-Three-Buckets)"""
+    y = np.asarray(values, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    # Rows are evenly spaced in time, so positions stand in for the x axis
+    x = np.arange(n, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    
+    anchor = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_x, next_y = x[end:edges[i + 2]].mean(), y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+        
+        # Keep the point forming the largest triangle with the last kept point and the next bucket's mean
+        areas = np.abs((x[anchor] - next_x) * (y[start:end] - y[anchor]) - (x[anchor] - x[start:end]) * (next_y - y[anchor]))
+        anchor = start + int(areas.argmax())
+        selected[i + 1] = anchor
+    
+    return selected
+
+def select_extreme_rows(df, column, k, largest=True):
+    """Return the k rows with the largest (or smallest) values in a column via a partial sort"""
+    k = min(k, len(df))
+    if k == 0:
+        return df.iloc[:0]
+    
+    keys = df[column].to_numpy()
+    keys = -keys if largest else keys
+    kth = np.partition(keys, k - 1)[k - 1]
+    
+    # Like nlargest/nsmallest(keep='first'), ties at the cut-off go to the earliest rows
+    selected = np.flatnonzero(keys < kth)
+    ties = np.flatnonzero(keys == kth)[:k - len(selected)]
+    idx = np.concatenate([selected, ties])
+    return df.iloc[idx[np.argsort(keys[idx], kind='stable')]]
+
+@st.cache_data(show_spinner=False)
+def build_export_report(users_df, usage_df):
+    """Build the Excel report bytes once per users and usage frames"""
+    processor = DataProcessor()
+    processor.users_df = users_df
+    processor.usage_df = usage_df
+    return DataStorage().create_comprehensive_report_bytes(users_df, usage_df, processor.export_summary_stats())
+
+def lookup_codes(keys, codes, values):
+    """Map each value to the code stored for its key, or -1 when the key is unknown"""
+    keys = pd.Index(keys)
+    first = ~keys.duplicated()
+    positions = keys[first].get_indexer(values)
+    return np.where(positions >= 0, np.asarray(codes)[first][positions], -1)
+
 class CursorDashboard:
     """Main dashboard class for Cursor usage analytics"""
     
@@ -31,6 +289,8 @@ class CursorDashboard:
         self.api_client = None
         self.data_processor = DataProcessor()
         self.storage = DataStorage()
+        # Row counts of the loaded frames, set once per run for the render methods to check
+        self.users_rows = self.usage_rows = self.daily_rows = 0
         self.initialize_session_state()
     
     def initialize_session_state(self):
@@ -51,6 +311,14 @@ class CursorDashboard:
             st.session_state.usage_events_df = None
         if 'spending_data' not in st.session_state:
             st.session_state.spending_data = None
+        if 'events_by_user_model' not in st.session_state:
+            st.session_state.events_by_user_model = None
+        if 'spending_agg' not in st.session_state:
+            st.session_state.spending_agg = None
+        if 'top_users_by_metric' not in st.session_state:
+            st.session_state.top_users_by_metric = {}
+        if 'activity_codes' not in st.session_state:
+            st.session_state.activity_codes = None
     
     def validate_config(self):
         """Validate configuration and show setup instructions if needed"""
@@ -78,210 +346,211 @@ class CursorDashboard:
     def setup_api_client(self):
         """Setup the API client with error handling"""
         try:
-            self.api_client = CursorAPIClient(
-                api_key=Config.CURSOR_API_KEY,
-                org_id=Config.CURSOR_ORG_ID,
-                base_url=Config.CURSOR_API_BASE_URL
+            self.api_client = get_api_client(
+                Config.CURSOR_API_KEY,
+                Config.CURSOR_ORG_ID,
+                Config.CURSOR_API_BASE_URL
             )
             return True
         except Exception as e:
             st.error(f"Failed to initialize API client: {e}")
             return False
     
-    @st.cache_data(ttl=Config.REFRESH_INTERVAL_MINUTES * 60)
-    def load_data(_self, force_refresh=False):
+    def load_data(self, force_refresh=False):
         """Load data from API or cache"""
+        # Derived frames are returned to run(), which stores them in session state and
+        # persists them as Parquet next to the processed users and usage frames
+        daily_df = usage_events_df = spending_df = None
         try:
             # Check if we should use cached data
-            if not force_refresh and _self.storage.is_cache_valid():
+            # The data service owns the cache timestamp, so the usage Parquet file needs its own freshness check
+            if not force_refresh and self.storage.is_cache_valid() and self.storage.is_file_fresh(Config.USAGE_DF_FILE):
                 st.info("Using cached data. Click 'Refresh Data' to fetch latest.")
-                users_data = _self.storage.load_users_data()
-                usage_data = _self.storage.load_usage_data()
+                users_data = self.storage.load_users_data()
+                usage_df = self.storage.load_dataframe(Config.USAGE_DF_FILE)
                 
-                if users_data is not None and usage_data is not None:
-                    return users_data, usage_data
+                if users_data is not None and usage_df is not None:
+                    daily_df = self.storage.load_dataframe(Config.DAILY_USAGE_FILE)
+                    usage_events_df = self.storage.load_dataframe(Config.USAGE_EVENTS_FILE, columns=EVENT_COLUMNS)
+                    spending_df = self.storage.load_spending_data() if self.storage.is_file_fresh(Config.SPENDING_FILE) else None
+                    return users_data, usage_df, daily_df, usage_events_df, spending_df
             
             # Fetch fresh data from API
             with st.spinner("Fetching data from Cursor API..."):
-                if not _self.api_client:
-                    if not _self.setup_api_client():
-                        return None, None
-                
-                # Get organization info
-                org_info = _self.api_client.get_organization_info()
-                st.success(f"Connected to organization: {org_info.get('name', 'Unknown')}")
+                if not self.api_client:
+                    if not self.setup_api_client():
+                        return None, None, None, None, None
                 
-                # Get all users
-                users_data = _self.api_client.get_all_users()
-                st.info(f"Found {len(users_data)} users")
+                # Organization info and the user list are independent round-trips, so fetch them together
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    org_info_future = executor.submit(self.api_client.get_organization_info)
+                    users_future = executor.submit(self.api_client.get_all_users)
+                    
+                    # Get organization info
+                    org_info = org_info_future.result()
+                    st.success(f"Connected to organization: {org_info.get('name', 'Unknown')}")
+                    
+                    # Get all users
+                    users_data = users_future.result()
+                    st.info(f"Found {len(users_data)} users")
                 
-                # Initialize usage data
-                usage_data = {}
+                # Per-user usage metrics, one row per user
+                usage_df = pd.DataFrame()
                 
                 # Get usage data for all users if we have users
                 if users_data:
                     user_ids = [user['id'] for user in users_data]
+                    usage_data = {}
                     
                     progress_bar = st.progress(0)
                     
-                    for i, user_id in enumerate(user_ids):
-                        usage_data[user_id] = _self.api_client.get_user_usage(user_id)
-                        progress_bar.progress((i + 1) / len(user_ids))
+                    # The client is synchronous, so overlap the network waits in threads; the client
+                    # throttles the shared rate, and emails come from the member list already fetched
+                    emails = self.api_client.member_emails(users_data)
+                    with ThreadPoolExecutor(max_workers=Config.MAX_CONCURRENT_REQUESTS) as executor:
+                        futures = [
+                            executor.submit(self.api_client.get_user_usage, user_id, user_email=emails.get(user_id))
+                            for user_id in user_ids
+                        ]
+                        for i, (user_id, future) in enumerate(zip(user_ids, futures)):
+                            try:
+                                usage_data[user_id] = future.result()
+                            except Exception as e:
+                                logger.warning(f"Failed to get usage for user {user_id}: {e}")
+                            progress_bar.progress((i + 1) / len(user_ids))
                     
                     progress_bar.empty()
+                    usage_df = self.data_processor.process_usage_data(usage_data)
                     st.success(f"Loaded usage data for {len(usage_data)} users")
                     
                 else:
                     # If no team members, try to get usage data from usage events and daily usage
                     st.info("No team members found, extracting users from usage data...")
                     
-                    # Get daily usage data - collect all data efficiently
-                    with st.spinner("Loading daily usage data..."):
-                        daily_usage = _self.api_client.get_daily_usage_data()
-                        daily_data = daily_usage.get('data', [])
-                        st.session_state.daily_usage_df = _self.data_processor.process_daily_usage_data(daily_usage)
-                    
-                    # Get usage events for spending analysis
-                    with st.spinner("Loading usage events data..."):
-                        usage_events = _self.api_client.get_usage_events(page_size=1000)
-                        events = usage_events.get('usageEvents', [])
-                        st.session_state.usage_events_df = _self.data_processor.process_usage_events_data(usage_events)
-                    
-                    # Get spending data
-                    with st.spinner("Loading spending data..."):
-                        spending_data = _self.api_client.get_spending_data()
-                        st.session_state.spending_data = _self.data_processor.process_spending_data(spending_data)
-                    
-                    # Extract user emails from both sources
-                    user_emails = set()
-                    user_email_to_data = {}
+                    # The daily usage, usage events and spending fetches are independent, so start them together
+                    with ThreadPoolExecutor(max_workers=3) as executor:
+                        daily_future = executor.submit(self.api_client.get_daily_usage_data)
+                        events_future = executor.submit(asyncio.run, self.api_client.get_all_usage_events(page_size=1000))
+                        spending_future = executor.submit(self.api_client.get_spending_data)
+                        
+                        # Get daily usage data - collect all data efficiently
+                        with st.spinner("Loading daily usage data..."):
+                            daily_df = self.data_processor.process_daily_usage_data(daily_future.result())
+                            user_stats = self.data_processor.aggregate_daily_usage_by_user(daily_df)
+                        
+                        # Get usage events for spending analysis
+                        with st.spinner("Loading usage events data..."):
+                            usage_events_df = self.data_processor.process_usage_events_data(events_future.result())
+                        
+                        # Get spending data
+                        with st.spinner("Loading spending data..."):
+                            spending_df = self.data_processor.process_spending_data(spending_future.result())
                     
-                    # From daily usage data (primary source) - collect all data per user
-                    for day in daily_data:
-                        if day.get('email'):
-                            email = day.get('email')
-                            user_emails.add(email)
-                            if email not in user_email_to_data:
-                                user_email_to_data[email] = {
-                                    'daily_data': [],
-                                    'total_requests': 0,
-                                    'total_chat_requests': 0,
-                                    'total_composer_requests': 0,
-                                    'is_active': False,
-                                    'last_seen': None
-                                }
-                            
-                            user_email_to_data[email]['daily_data'].append(day)
-                            user_email_to_data[email]['total_requests'] += day.get('chatRequests', 0) + day.get('composerRequests', 0)
-                            user_email_to_data[email]['total_chat_requests'] += day.get('chatRequests', 0)
-                            user_email_to_data[email]['total_composer_requests'] += day.get('composerRequests', 0)
-                            if day.get('isActive'):
-                                user_email_to_data[email]['is_active'] = True
-                            
-                            # Convert timestamp to datetime for last seen
-                            if day.get('date'):
-                                day_date = datetime.fromtimestamp(day.get('date') / 1000)
-                                if not user_email_to_data[email]['last_seen'] or day_date > user_email_to_data[email]['last_seen']:
-                                    user_email_to_data[email]['last_seen'] = day_date
+                    # Extract user emails from both sources, daily usage being the primary one
+                    user_emails = set(user_stats.index)
                     
                     # From usage events (secondary source for missing users)
-                    for event in events:
-                        if event.get('userEmail'):
-                            user_emails.add(event.get('userEmail'))
+                    if 'userEmail' in usage_events_df.columns:
+                        user_emails.update(usage_events_df['userEmail'].dropna().unique().tolist())
+                        user_emails.discard('')
                     
                     st.info(f"Extracted {len(user_emails)} unique users from usage data")
                     
                     if user_emails:
                         current_time = datetime.now()
                         
+                        # Time values shared by every user row
+                        default_last_seen = current_time - timedelta(days=7)
+                        active_cutoff = current_time - timedelta(days=8)  # i.e. (now - last_seen).days <= 7
+                        period_start_iso = (current_time - timedelta(days=30)).isoformat()
+                        
+                        # Line the daily totals up with every user, including those only seen in usage events
+                        emails = list(user_emails)
+                        stats = user_stats.reindex(index=emails, columns=[
+                            'total_sessions', 'total_requests', 'total_chat_requests', 'total_composer_requests',
+                            'total_tokens', 'unique_days_active', 'is_active', 'last_seen'
+                        ])
+                        counts = stats.drop(columns=['is_active', 'last_seen']).fillna(0).astype(np.int64)
+                        ever_active = stats['is_active'].fillna(False).astype(bool)
+                        
+                        # Bucket request volume into activity levels in one vectorised pass
+                        request_totals = counts['total_requests'].to_numpy()
+                        activity_levels = np.select(
+                            [request_totals > 100, request_totals > 20], ['high', 'medium'], default='low'
+                        ).tolist()
+                        
                         # Convert to users_data format
                         users_data = []
-                        for email in user_emails:
-                            # Extract real name from email
-                            name_part = email.split('@')[0] if '@' in email else email
-                            
-                            # Convert dots and underscores to spaces and title case
-                            if '.' in name_part:
-                                display_name = ' '.join(word.capitalize() for word in name_part.split('.'))
-                            elif '_' in name_part:
-                                display_name = ' '.join(word.capitalize() for word in name_part.split('_'))
-                            else:
-                                display_name = name_part.capitalize()
-                            
+                        for email, activity_level, last_seen, was_active in zip(emails, activity_levels, stats['last_seen'], ever_active):
                             # Get last seen date
-                            user_data = user_email_to_data.get(email, {})
-                            last_seen = user_data.get('last_seen') or (current_time - timedelta(days=7))
+                            last_seen = datetime.fromtimestamp(last_seen.timestamp()) if pd.notna(last_seen) else default_last_seen
                             
                             # Determine activity status based on last 7 days
-                            is_active = (current_time - last_seen).days <= 7 if user_data.get('is_active') else False
+                            is_active = last_seen > active_cutoff if was_active else False
                             
                             users_data.append({
                                 'id': email,
-                                'name': display_name,
+                                'name': derive_display_name(email),
                                 'email': email,
                                 'status': 'active' if is_active else 'inactive',
                                 'last_active': last_seen.isoformat(),
-                                'created_at': (current_time - timedelta(days=30)).isoformat(),
-                                'activity_level': 'high' if user_data.get('total_requests', 0) > 100 else 'medium' if user_data.get('total_requests', 0) > 20 else 'low'
+                                'created_at': period_start_iso,
+                                'activity_level': activity_level
                             })
                         
-                        # Process usage data efficiently from collected information
-                        progress_bar = st.progress(0)
-                        
-                        for i, email in enumerate(user_emails):
-                            user_data = user_email_to_data.get(email, {})
-                            
-                            usage_data[email] = {
-                                'user_id': email,
-                                'period': {
-                                    'start': (current_time - timedelta(days=30)).isoformat(),
-                                    'end': current_time.isoformat()
-                                },
-                                'metrics': {
-                                    'total_sessions': len(user_data.get('daily_data', [])),
-                                    'total_requests': user_data.get('total_requests', 0),
-                                    'total_tokens': user_data.get('total_requests', 0) * 1000,  # Estimate
-                                    'unique_days_active': len([d for d in user_data.get('daily_data', []) if d.get('isActive')]),
-                                    'avg_session_duration': 120,  # Default
-                                    'feature_usage': {
-                                        'chat': user_data.get('total_chat_requests', 0),
-                                        'composer': user_data.get('total_composer_requests', 0),
-                                        'code_completion': user_data.get('total_requests', 0),
-                                        'diff': 0,
-                                        'search': 0,
-                                        'refactor': 0,
-                                        'debug': 0
-                                    }
-                                },
-                                'daily_breakdown': [
-                                    {
-                                        'date': datetime.fromtimestamp(day.get('date', 0) / 1000).strftime('%Y-%m-%d'),
-                                        'total_requests': day.get('chatRequests', 0) + day.get('composerRequests', 0),
-                                        'chat_requests': day.get('chatRequests', 0),
-                                        'composer_requests': day.get('composerRequests', 0),
-                                        'total_tokens': (day.get('chatRequests', 0) + day.get('composerRequests', 0)) * 1000
-                                    }
-                                    for day in user_data.get('daily_data', [])
-                                ]
-                            }
-                            
-                            progress_bar.progress((i + 1) / len(user_emails))
+                        # Build the per-user usage frame straight from the aggregated columns
+                        usage_df = self.data_processor.process_usage_frame(pd.DataFrame({
+                            'user_id': emails,
+                            'total_sessions': counts['total_sessions'].to_numpy(),
+                            'total_requests': request_totals,
+                            'total_tokens': counts['total_tokens'].to_numpy(),  # Estimate
+                            'unique_days_active': counts['unique_days_active'].to_numpy(),
+                            'avg_session_duration': 120,  # Default
+                            'feature_chat': counts['total_chat_requests'].to_numpy(),
+                            'feature_composer': counts['total_composer_requests'].to_numpy(),
+                            'feature_code_completion': request_totals,
+                            'feature_diff': 0,
+                            'feature_search': 0,
+                            'feature_refactor': 0,
+                            'feature_debug': 0
+                        }))
                         
-                        progress_bar.empty()
                         st.success(f"Successfully processed {len(user_emails)} users with real names and usage data")
                     else:
                         st.warning("No user data found in daily usage or events")
                 
                 # Save to cache
-                _self.storage.save_users_data(users_data)
-                _self.storage.save_usage_data(usage_data)
+                self.storage.save_users_data(users_data)
+                for df, file_path in [
+                    (daily_df, Config.DAILY_USAGE_FILE),
+                    (usage_events_df, Config.USAGE_EVENTS_FILE)
+                ]:
+                    if df is not None and not df.empty:
+                        self.storage.save_dataframe(df, file_path)
                 
-                return users_data, usage_data
+                return users_data, usage_df, daily_df, usage_events_df, spending_df
                 
         except Exception as e:
             st.error(f"Error loading data: {e}")
             logger.error(f"Data loading error: {e}")
-            return None, None
+            return None, None, None, None, None
+    
+    def load_persisted_data(self):
+        """Load processed DataFrames saved by a recent session, skipping the API and processing"""
+        if not (self.storage.is_file_fresh(Config.USERS_DF_FILE) and self.storage.is_file_fresh(Config.USAGE_DF_FILE)):
+            return None
+        
+        users_df = self.storage.load_dataframe(Config.USERS_DF_FILE)
+        usage_df = self.storage.load_dataframe(Config.USAGE_DF_FILE)
+        if users_df is None or usage_df is None:
+            return None
+        
+        daily_df, usage_events_df = [
+            self.storage.load_dataframe(file_path, columns=columns) if self.storage.is_file_fresh(file_path) else None
+            for file_path, columns in [(Config.DAILY_USAGE_FILE, None), (Config.USAGE_EVENTS_FILE, EVENT_COLUMNS)]
+        ]
+        spending_df = self.storage.load_spending_data() if self.storage.is_file_fresh(Config.SPENDING_FILE) else None
+        return users_df, usage_df, daily_df, usage_events_df, spending_df
     
     def render_sidebar(self):
         """Render the sidebar with controls and filters"""
@@ -295,6 +564,7 @@ class CursorDashboard:
         with col1:
             if st.button("🔄 Refresh Data", help="Fetch latest data from API"):
                 st.session_state.data_loaded = False
+                st.session_state.force_refresh = True
                 st.rerun()
         
         with col2:
@@ -392,18 +662,27 @@ class CursorDashboard:
                 help="Average session duration in minutes"
             )
     
-    def render_top_users_chart(self, usage_df, metric='total_requests', top_n=10):
-        """Render top users chart"""
+    @st.fragment
+    def render_top_users_chart(self, usage_df, top_n=10, top_users_by_metric=None):
+        """Render top users chart with its metric picker, reusing precomputed top rows when given"""
         if usage_df.empty:
             return
         
-        top_users = usage_df.nlargest(top_n, metric)
+        metric = st.selectbox(
+            "Rank by:",
+            TOP_USER_METRICS,
+            format_func=lambda metric: METRIC_LABELS.get(metric, metric)
+        )
+        
+        top_users = (top_users_by_metric or {}).get(metric)
+        if top_users is None:
+            top_users = select_extreme_rows(usage_df, metric, top_n)
         
         fig = px.bar(
             top_users,
             x='user_id',
             y=metric,
-            title=f"Top {top_n} Users by {metric.replace('_', ' ').title()}",
+            title=f"Top {top_n} Users by {METRIC_LABELS[metric]}",
             color=metric,
             color_continuous_scale='Blues'
         )
@@ -411,7 +690,7 @@ class CursorDashboard:
         fig.update_layout(
             height=Config.DEFAULT_CHART_HEIGHT,
             xaxis_title="User ID",
-            yaxis_title=metric.replace('_', ' ').title(),
+            yaxis_title=METRIC_LABELS[metric],
             showlegend=False
         )
         
@@ -430,47 +709,9 @@ class CursorDashboard:
         if trends_df.empty:
             return
         
-        fig = make_subplots(
-            rows=2, cols=2,
-            subplot_titles=('Daily Requests', 'Daily Sessions', 'Daily Tokens', 'Active Users'),
-            specs=[[{"secondary_y": False}, {"secondary_y": False}],
-                   [{"secondary_y": False}, {"secondary_y": False}]]
-        )
-        
-        # Daily requests
-        fig.add_trace(
-            go.Scatter(x=trends_df['date'], y=trends_df['requests'], 
-                      mode='lines+markers', name='Requests'),
-            row=1, col=1
-        )
-        
-        # Daily sessions
-        fig.add_trace(
-            go.Scatter(x=trends_df['date'], y=trends_df['sessions'], 
-                      mode='lines+markers', name='Sessions'),
-            row=1, col=2
-        )
-        
-        # Daily tokens
-        fig.add_trace(
-            go.Scatter(x=trends_df['date'], y=trends_df['tokens'], 
-                      mode='lines+markers', name='Tokens'),
-            row=2, col=1
-        )
-        
-        # Active users
-        if 'unique_users' in trends_df.columns:
-            fig.add_trace(
-                go.Scatter(x=trends_df['date'], y=trends_df['unique_users'], 
-                          mode='lines+markers', name='Active Users'),
-                row=2, col=2
-            )
-        
-        fig.update_layout(
-            height=600,
-            title_text="Usage Trends Over Time",
-            showlegend=False
-        )
+        # Only the plotted columns are hashed for the figure cache
+        plotted = [col for col in ['date', 'requests', 'sessions', 'tokens', 'unique_users'] if col in trends_df.columns]
+        fig = build_usage_trends_chart(trends_df[plotted])
         
         st.plotly_chart(fig, use_container_width=True)
     
@@ -556,13 +797,14 @@ class CursorDashboard:
         
         st.plotly_chart(fig, use_container_width=True)
     
+    @st.fragment
     def render_premium_requests_analysis(self):
         """Render Premium Requests Analysis section"""
         st.markdown("---")
         st.header("💎 Premium Requests Analysis")
         
-        # Check if daily usage data is available and not None
-        if 'daily_usage_df' in st.session_state and st.session_state.daily_usage_df is not None and not st.session_state.daily_usage_df.empty:
+        # Check if daily usage data was loaded
+        if self.daily_rows:
             daily_df = st.session_state.daily_usage_df
             
             # Calculate overall breakdown
@@ -601,10 +843,7 @@ class CursorDashboard:
             
             with col2:
                 # Top users by usage-based requests
-                user_premium = daily_df.groupby('email').agg({
-                    'usage_based_requests': 'sum',
-                    'subscription_requests': 'sum'
-                }).reset_index().sort_values('usage_based_requests', ascending=False).head(10)
+                user_premium = compute_top_premium_users(daily_df)
                 
                 if not user_premium.empty:
                     fig_bar = px.bar(
@@ -619,28 +858,18 @@ class CursorDashboard:
         else:
             st.info("No premium requests data available")
     
+    @st.fragment
     def render_individual_spending_analysis(self):
         """Render individual user spending analysis"""
         st.markdown("---")
         st.header("💸 Individual User Spending")
         
-        # Check if usage events data is available and not None
-        if 'usage_events_df' in st.session_state and st.session_state.usage_events_df is not None and not st.session_state.usage_events_df.empty:
-            events_df = st.session_state.usage_events_df
-            
-            # Calculate spending by user
-            user_spending = events_df.groupby('userEmail').agg({
-                'cost_cents': 'sum',
-                'input_tokens': 'sum',
-                'output_tokens': 'sum',
-                'model_used': 'count'  # Number of requests
-            }).reset_index()
-            
-            user_spending['cost_dollars'] = user_spending['cost_cents'] / 100
-            user_spending['total_tokens'] = user_spending['input_tokens'] + user_spending['output_tokens']
-            user_spending = user_spending.sort_values('cost_dollars', ascending=False)
+        # Check if per-user spending was aggregated from usage events for the filtered users
+        spending_view = st.session_state.get('spending_agg_view')
+        if spending_view is not None and not spending_view.empty:
+            user_spending = spending_view.rename(columns={'event_tokens': 'total_tokens'})
             
-            # Summary metrics
+            # Summary metrics (order-invariant, so the frame stays unsorted)
             total_spending = user_spending['cost_dollars'].sum()
             avg_spending = user_spending['cost_dollars'].mean()
             median_spending = user_spending['cost_dollars'].median()
@@ -660,7 +889,7 @@ class CursorDashboard:
             
             with col1:
                 # Top spenders
-                top_spenders = user_spending.head(10)
+                top_spenders = user_spending.nlargest(10, 'cost_dollars')
                 fig_spenders = px.bar(
                     top_spenders,
                     x='userEmail',
@@ -672,24 +901,29 @@ class CursorDashboard:
                 st.plotly_chart(fig_spenders, use_container_width=True)
             
             with col2:
-                # Spending distribution
-                fig_hist = px.histogram(
-                    user_spending,
-                    x='cost_dollars',
-                    nbins=20,
+                # Spending distribution - bin server-side so only the 20 bars are sent
+                counts, edges = np.histogram(user_spending['cost_dollars'].to_numpy(), bins=20)
+                fig_hist = go.Figure(go.Bar(
+                    x=(edges[:-1] + edges[1:]) / 2,
+                    y=counts,
+                    width=np.diff(edges)
+                ))
+                fig_hist.update_layout(
                     title="Spending Distribution",
-                    labels={'cost_dollars': 'Spending ($)', 'count': 'Number of Users'}
+                    xaxis_title="Spending ($)",
+                    yaxis_title="Number of Users",
+                    bargap=0
                 )
                 st.plotly_chart(fig_hist, use_container_width=True)
             
             # Detailed table
             with st.expander("📋 Detailed User Spending", expanded=False):
                 st.dataframe(
-                    user_spending[['userEmail', 'cost_dollars', 'total_tokens', 'model_used']].rename(columns={
+                    user_spending.sort_values('cost_dollars', ascending=False)[['userEmail', 'cost_dollars', 'total_tokens', 'requests']].rename(columns={
                         'userEmail': 'User Email',
                         'cost_dollars': 'Spending ($)',
                         'total_tokens': 'Total Tokens',
-                        'model_used': 'Requests'
+                        'requests': 'Requests'
                     }),
                     use_container_width=True
                 )
@@ -707,27 +941,22 @@ class CursorDashboard:
                 st.metric("📅 Subscription Cost", f"${spending.get('subscription_cost', 0):.2f}")
                 st.metric("💱 Currency", spending.get('currency', 'USD'))
     
+    @st.fragment
     def render_model_usage_analysis(self):
         """Render model usage analytics"""
         st.markdown("---")
         st.header("🤖 Model Usage Analytics")
         
-        # Check if daily usage data is available and not None
-        if 'daily_usage_df' in st.session_state and st.session_state.daily_usage_df is not None and not st.session_state.daily_usage_df.empty:
+        # Check if daily usage data was loaded
+        if self.daily_rows:
             daily_df = st.session_state.daily_usage_df
             
-            # Model popularity from daily usage
-            model_popularity = daily_df['primary_model'].value_counts().reset_index()
-            model_popularity.columns = ['model', 'usage_count']
-            model_popularity = model_popularity.sort_values('usage_count', ascending=False)
+            # Model popularity from daily usage, with rank numbers and shares
+            model_popularity = compute_model_popularity(daily_df)
             
             # Display Model Rankings Table
             st.subheader("🏆 Model Usage Rankings (Highest to Lowest)")
             
-            # Add rank numbers
-            model_popularity['rank'] = range(1, len(model_popularity) + 1)
-            model_popularity['percentage'] = (model_popularity['usage_count'] / model_popularity['usage_count'].sum() * 100).round(2)
-            
             # Display the rankings table
             rankings_display = model_popularity[['rank', 'model', 'usage_count', 'percentage']].copy()
             rankings_display.columns = ['Rank', 'Model', 'Usage Count', 'Percentage (%)']
@@ -738,52 +967,47 @@ class CursorDashboard:
             with col1:
                 # Model popularity bar chart (sorted highest to lowest)
                 if not model_popularity.empty:
-                    fig_models = px.bar(
-                        model_popularity,
-                        x='model',
-                        y='usage_count',
-                        title="Model Usage (Highest to Lowest)",
-                        color='usage_count',
-                        color_continuous_scale='Viridis',
-                        text='usage_count'
+                    fig_models = build_bar_chart(
+                        model_popularity[['model', 'usage_count']],
+                        'model',
+                        'usage_count',
+                        "Model Usage (Highest to Lowest)",
+                        'Viridis',
+                        show_values=True
                     )
-                    fig_models.update_layout(xaxis_tickangle=45)
-                    fig_models.update_traces(texttemplate='%{text}', textposition='outside')
                     st.plotly_chart(fig_models, use_container_width=True)
             
             with col2:
                 # Model popularity pie chart
                 if not model_popularity.empty:
-                    fig_pie = px.pie(
-                        model_popularity,
-                        values='usage_count',
-                        names='model',
-                        title="Model Distribution"
+                    fig_pie = build_pie_chart(
+                        model_popularity[['model', 'usage_count']],
+                        'usage_count',
+                        'model',
+                        "Model Distribution"
                     )
                     st.plotly_chart(fig_pie, use_container_width=True)
             
             # Top model users analysis
             st.subheader("👥 Top Users by Model Usage")
-            user_models = daily_df.groupby(['email', 'primary_model']).size().reset_index(name='days_used')
-            top_user_models = user_models.groupby('email')['days_used'].sum().reset_index().sort_values('days_used', ascending=False).head(10)
+            top_user_models = compute_top_model_users(daily_df)
             
             if not top_user_models.empty:
                 # Extract real names from emails
-                top_user_models['name'] = top_user_models['email'].apply(lambda x: x.split('@')[0].replace('.', ' ').title())
+                emails = top_user_models['email'].astype(str)
+                top_user_models['name'] = emails.map(email_display_names(tuple(emails.unique())))
                 
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    fig_user_models = px.bar(
-                        top_user_models,
-                        x='name',
-                        y='days_used',
-                        title="Top 10 Users by Model Usage Days",
-                        color='days_used',
-                        color_continuous_scale='Blues',
+                    fig_user_models = build_bar_chart(
+                        top_user_models[['name', 'days_used']],
+                        'name',
+                        'days_used',
+                        "Top 10 Users by Model Usage Days",
+                        'Blues',
                         labels={'days_used': 'Days Used', 'name': 'User'}
                     )
-                    fig_user_models.update_layout(xaxis_tickangle=45)
                     st.plotly_chart(fig_user_models, use_container_width=True)
                 
                 with col2:
@@ -792,31 +1016,22 @@ class CursorDashboard:
                     top_display.columns = ['Name', 'Email', 'Days Used']
                     st.dataframe(top_display, use_container_width=True, hide_index=True)
         
-        # Detailed model analysis from usage events
-        if 'usage_events_df' in st.session_state and st.session_state.usage_events_df is not None and not st.session_state.usage_events_df.empty:
-            events_df = st.session_state.usage_events_df
+        # Detailed model analysis from the filtered users' usage events
+        user_model_view = st.session_state.get('events_by_user_model_view')
+        if user_model_view is not None and not user_model_view.empty:
             
             st.subheader("🔍 Detailed Model Analysis")
             
-            # Model cost and usage analysis
-            model_analysis = events_df.groupby('model_used').agg({
-                'cost_cents': ['sum', 'mean', 'count'],
-                'input_tokens': 'sum',
-                'output_tokens': 'sum',
-                'is_max_mode': 'sum'
-            }).round(2)
-            
-            model_analysis.columns = ['Total Cost (¢)', 'Avg Cost (¢)', 'Requests', 'Input Tokens', 'Output Tokens', 'Max Mode Usage']
-            model_analysis['Total Cost ($)'] = model_analysis['Total Cost (¢)'] / 100
-            model_analysis['Avg Cost ($)'] = model_analysis['Avg Cost (¢)'] / 100
+            # Model cost and usage analysis, rolled up from the per-user aggregate
+            model_analysis = compute_model_totals(user_model_view)
             
             # Display model performance metrics
             col1, col2, col3 = st.columns(3)
             
             if not model_analysis.empty:
-                most_expensive = model_analysis.loc[model_analysis['Total Cost ($)'].idxmax()]
-                most_used = model_analysis.loc[model_analysis['Requests'].idxmax()]
-                highest_avg = model_analysis.loc[model_analysis['Avg Cost ($)'].idxmax()]
+                # One argmax pass over the three ranking columns instead of three nlargest calls
+                leaders = model_analysis[['Total Cost ($)', 'Requests', 'Avg Cost ($)']].to_numpy(dtype=np.float64).argmax(axis=0)
+                most_expensive, most_used, highest_avg = (model_analysis.iloc[i] for i in leaders)
                 
                 with col1:
                     st.metric("💰 Most Expensive Model", most_expensive.name, f"${most_expensive['Total Cost ($)']:.2f}")
@@ -825,13 +1040,16 @@ class CursorDashboard:
                 with col3:
                     st.metric("💸 Highest Avg Cost", highest_avg.name, f"${highest_avg['Avg Cost ($)']:.4f}")
             
-            # Model comparison table
-            with st.expander("📋 Model Comparison Table", expanded=False):
-                st.dataframe(
-                    model_analysis.reset_index().rename(columns={'model_used': 'Model'}),
-                    use_container_width=True
-                )
+            # Model comparison table, only built and sent to the browser once requested
+            st.checkbox("📋 Show model comparison table", key='show_model_detail')
+            if st.session_state.get('show_model_detail', False):
+                with st.expander("📋 Model Comparison Table", expanded=True):
+                    st.dataframe(
+                        model_analysis.reset_index().rename(columns={'model_used': 'Model'}),
+                        use_container_width=True
+                    )
     
+    @st.fragment
     def render_comprehensive_top_users(self):
         """Render comprehensive top users analysis with spending and token information"""
         st.markdown("---")
@@ -841,30 +1059,18 @@ class CursorDashboard:
         users_df = st.session_state.get('users_data')
         usage_df = st.session_state.get('usage_data')
         
-        if users_df is not None and usage_df is not None and not users_df.empty and not usage_df.empty:
-            # Merge users and usage data
+        if self.users_rows and self.usage_rows:
             try:
-                merged_df = pd.merge(users_df, usage_df, left_on='id', right_on='user_id', how='inner')
-                
-                # Calculate spending if usage events data is available
-                spending_data = None
-                if 'usage_events_df' in st.session_state and st.session_state.usage_events_df is not None:
-                    events_df = st.session_state.usage_events_df
-                    spending_data = events_df.groupby('userEmail').agg({
-                        'cost_cents': 'sum',
-                        'input_tokens': 'sum',
-                        'output_tokens': 'sum',
-                        'model_used': 'count'
-                    }).reset_index()
-                    spending_data['cost_dollars'] = spending_data['cost_cents'] / 100
-                    spending_data['event_tokens'] = spending_data['input_tokens'] + spending_data['output_tokens']
+                # Spending aggregated once at load time, if usage events are available
+                spending_data = st.session_state.get('spending_agg')
                 
-                # Sort by total requests to get top users
-                top_users = merged_df.nlargest(20, 'total_requests')
+                # Take the top users from usage first so the joins only touch those rows
+                top_usage = select_extreme_rows(usage_df[usage_df['user_id'].isin(users_df['id'])], 'total_requests', 20)
+                top_users = top_usage.join(users_df.set_index('id'), on='user_id', how='inner')
                 
-                # Merge with spending data if available
+                # Join spending data if available
                 if spending_data is not None:
-                    top_users = pd.merge(top_users, spending_data, left_on='email', right_on='userEmail', how='left')
+                    top_users = top_users.join(spending_data.set_index('user_id'), on='user_id').reset_index(drop=True)
                     top_users['cost_dollars'] = top_users['cost_dollars'].fillna(0)
                     top_users['event_tokens'] = top_users['event_tokens'].fillna(0)
                     
@@ -887,15 +1093,13 @@ class CursorDashboard:
                 
                 with col1:
                     st.subheader("📊 Top Users by Requests")
-                    fig_requests = px.bar(
-                        top_users.head(10),
-                        x='name',
-                        y='total_requests',
-                        title="Top 10 Users by Total Requests",
-                        color='total_requests',
-                        color_continuous_scale='Viridis'
+                    fig_requests = build_bar_chart(
+                        top_users.head(10)[['name', 'total_requests']],
+                        'name',
+                        'total_requests',
+                        "Top 10 Users by Total Requests",
+                        'Viridis'
                     )
-                    fig_requests.update_layout(xaxis_tickangle=45)
                     st.plotly_chart(fig_requests, use_container_width=True)
                 
                 with col2:
@@ -903,29 +1107,25 @@ class CursorDashboard:
                         st.subheader("💰 Top Spenders")
                         top_spenders = top_users[top_users['cost_dollars'] > 0].nlargest(10, 'cost_dollars')
                         if not top_spenders.empty:
-                            fig_spending = px.bar(
-                                top_spenders,
-                                x='name',
-                                y='cost_dollars',
-                                title="Top 10 Users by Spending",
-                                color='cost_dollars',
-                                color_continuous_scale='Reds'
+                            fig_spending = build_bar_chart(
+                                top_spenders[['name', 'cost_dollars']],
+                                'name',
+                                'cost_dollars',
+                                "Top 10 Users by Spending",
+                                'Reds'
                             )
-                            fig_spending.update_layout(xaxis_tickangle=45)
                             st.plotly_chart(fig_spending, use_container_width=True)
                         else:
                             st.info("No spending data available for users")
                     else:
                         st.subheader("🎯 Top Users by Tokens")
-                        fig_tokens = px.bar(
-                            top_users.head(10),
-                            x='name',
-                            y='total_tokens',
-                            title="Top 10 Users by Total Tokens",
-                            color='total_tokens',
-                            color_continuous_scale='Blues'
+                        fig_tokens = build_bar_chart(
+                            top_users.head(10)[['name', 'total_tokens']],
+                            'name',
+                            'total_tokens',
+                            "Top 10 Users by Total Tokens",
+                            'Blues'
                         )
-                        fig_tokens.update_layout(xaxis_tickangle=45)
                         st.plotly_chart(fig_tokens, use_container_width=True)
                 
                 # Summary metrics
@@ -975,6 +1175,7 @@ class CursorDashboard:
         else:
             st.info("Please refresh data to see comprehensive top users analysis")
 
+    @st.fragment
     def render_least_used_users(self):
         """Render least used users analysis"""
         st.markdown("---")
@@ -984,29 +1185,17 @@ class CursorDashboard:
         users_df = st.session_state.get('users_data')
         usage_df = st.session_state.get('usage_data')
         
-        if users_df is not None and usage_df is not None and not users_df.empty and not usage_df.empty:
+        if self.users_rows and self.usage_rows:
             try:
-                # Merge users and usage data
-                merged_df = pd.merge(users_df, usage_df, left_on='id', right_on='user_id', how='inner')
+                # Get least used users (bottom 10 by total requests) before joining user details
+                least_usage = select_extreme_rows(usage_df[usage_df['user_id'].isin(users_df['id'])], 'total_requests', 10, largest=False)
+                least_used = least_usage.join(users_df.set_index('id'), on='user_id', how='inner')
                 
-                # Get least used users (bottom 10 by total requests)
-                least_used = merged_df.nsmallest(10, 'total_requests')
-                
-                # Calculate spending if usage events data is available
-                spending_data = None
-                if 'usage_events_df' in st.session_state and st.session_state.usage_events_df is not None:
-                    events_df = st.session_state.usage_events_df
-                    spending_data = events_df.groupby('userEmail').agg({
-                        'cost_cents': 'sum',
-                        'input_tokens': 'sum',
-                        'output_tokens': 'sum',
-                        'model_used': 'count'
-                    }).reset_index()
-                    spending_data['cost_dollars'] = spending_data['cost_cents'] / 100
-                    spending_data['event_tokens'] = spending_data['input_tokens'] + spending_data['output_tokens']
-                    
-                    # Merge with spending data
-                    least_used = pd.merge(least_used, spending_data, left_on='email', right_on='userEmail', how='left')
+                # Spending aggregated once at load time, if usage events are available
+                spending_data = st.session_state.get('spending_agg')
+                if spending_data is not None:
+                    # Join spending data
+                    least_used = least_used.join(spending_data.set_index('user_id'), on='user_id').reset_index(drop=True)
                     least_used['cost_dollars'] = least_used['cost_dollars'].fillna(0)
                     least_used['event_tokens'] = least_used['event_tokens'].fillna(0)
                     
@@ -1027,28 +1216,24 @@ class CursorDashboard:
                 
                 with col1:
                     st.subheader("📊 Least Active Users by Requests")
-                    fig_requests = px.bar(
-                        least_used,
-                        x='name',
-                        y='total_requests',
-                        title="10 Least Active Users by Total Requests",
-                        color='total_requests',
-                        color_continuous_scale='Reds'
+                    fig_requests = build_bar_chart(
+                        least_used[['name', 'total_requests']],
+                        'name',
+                        'total_requests',
+                        "10 Least Active Users by Total Requests",
+                        'Reds'
                     )
-                    fig_requests.update_layout(xaxis_tickangle=45)
                     st.plotly_chart(fig_requests, use_container_width=True)
                 
                 with col2:
                     st.subheader("🎯 Least Active Users by Tokens")
-                    fig_tokens = px.bar(
-                        least_used,
-                        x='name',
-                        y='total_tokens',
-                        title="10 Least Active Users by Total Tokens",
-                        color='total_tokens',
-                        color_continuous_scale='Oranges'
+                    fig_tokens = build_bar_chart(
+                        least_used[['name', 'total_tokens']],
+                        'name',
+                        'total_tokens',
+                        "10 Least Active Users by Total Tokens",
+                        'Oranges'
                     )
-                    fig_tokens.update_layout(xaxis_tickangle=45)
                     st.plotly_chart(fig_tokens, use_container_width=True)
                 
                 # Summary for least used users
@@ -1116,26 +1301,22 @@ class CursorDashboard:
             return
         
         try:
-            # Get current data
-            users_df = self.data_processor.users_df
-            usage_df = self.data_processor.usage_df
-            analytics_data = self.data_processor.export_summary_stats()
+            # The sidebar renders before run() hands the frames to the processor, so read them from the session
+            users_df = st.session_state.users_data
+            usage_df = st.session_state.usage_data
             
-            # Create comprehensive report
-            file_path = self.storage.create_comprehensive_report(
-                users_df, usage_df, analytics_data
-            )
+            # Build the report in memory once per data load and hand the bytes straight to the download button
+            report_bytes = build_export_report(users_df, usage_df)
             
-            st.success(f"Data exported successfully to: {file_path}")
+            st.success("Report generated successfully")
             
             # Show download button
-            with open(file_path, 'rb') as f:
-                st.download_button(
-                    label="📥 Download Report",
-                    data=f.read(),
-                    file_name=os.path.basename(file_path),
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+            st.download_button(
+                label="📥 Download Report",
+                data=report_bytes,
+                file_name=f"cursor_usage_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
                 
         except Exception as e:
             st.error(f"Export failed: {e}")
@@ -1154,34 +1335,109 @@ class CursorDashboard:
         
         # Load data
         if not st.session_state.data_loaded:
-            users_data, usage_data = self.load_data()
+            force_refresh = st.session_state.pop('force_refresh', False)
+            if force_refresh:
+                fetch_organization_usage.clear()
+            persisted = None if force_refresh else self.load_persisted_data()
             
-            if users_data and usage_data:
+            if persisted is not None:
+                users_df, usage_df, daily_df, usage_events_df, spending_df = persisted
+            else:
+                users_data, usage_df, daily_df, usage_events_df, spending_df = self.load_data(force_refresh=force_refresh)
+                
+                if not users_data or usage_df is None or usage_df.empty:
+                    st.error("Failed to load data. Please check your API configuration.")
+                    return
+                
                 # Process data
                 users_df = self.data_processor.process_users_data(users_data)
-                usage_df = self.data_processor.process_usage_data(usage_data)
                 
-                # Store in session state
-                st.session_state.users_data = users_df
-                st.session_state.usage_data = usage_df
-                st.session_state.data_loaded = True
-                st.session_state.last_refresh = datetime.now()
+                # Persist processed frames so new sessions can skip the API
+                self.storage.save_dataframe(users_df, Config.USERS_DF_FILE)
+                self.storage.save_dataframe(usage_df, Config.USAGE_DF_FILE)
+                self.storage.save_spending_data(spending_df)
+            
+            # Store in session state
+            st.session_state.users_data = users_df
+            st.session_state.usage_data = usage_df
+            st.session_state.daily_usage_df = daily_df
+            st.session_state.usage_events_df = usage_events_df
+            st.session_state.spending_data = spending_df
+            
+            # Rank the top users per chart metric once; reruns only switch between them
+            st.session_state.top_users_by_metric = {
+                metric: select_extreme_rows(usage_df, metric, 10)
+                for metric in TOP_USER_METRICS if metric in usage_df.columns
+            }
+            
+            # Aggregate usage events once; per-user spending and per-model views roll this up
+            if usage_events_df is not None and not usage_events_df.empty:
+                st.session_state.events_by_user_model = compute_events_by_user_model(usage_events_df)
+                spending_agg = compute_user_spending(st.session_state.events_by_user_model)
+                # Key spending by user id once so the top/least views join on the shared user_id
+                email_to_id = dict(zip(users_df['email'], users_df['id'])) if 'email' in users_df.columns else {}
+                spending_agg['user_id'] = spending_agg['userEmail'].astype(object).map(email_to_id)
+                st.session_state.spending_agg = spending_agg
+            else:
+                st.session_state.events_by_user_model = None
+                st.session_state.spending_agg = None
+            
+            # Resolve every row's activity level code once; the activity filter then only compares integers
+            if 'activity_level' in users_df.columns:
+                activity_levels = users_df['activity_level'].astype('category')
+                level_codes = activity_levels.cat.codes.to_numpy()
+                activity_codes = {
+                    'categories': activity_levels.cat.categories,
+                    'usage': lookup_codes(users_df['id'], level_codes, usage_df['user_id']),
+                    'user_model': None,
+                    'spending': None
+                }
+                if 'email' in users_df.columns and st.session_state.events_by_user_model is not None:
+                    activity_codes['user_model'] = lookup_codes(
+                        users_df['email'], level_codes,
+                        st.session_state.events_by_user_model.index.get_level_values('userEmail').astype(object)
+                    )
+                    activity_codes['spending'] = lookup_codes(users_df['email'], level_codes, st.session_state.spending_agg['userEmail'].astype(object))
+                st.session_state.activity_codes = activity_codes
             else:
-                st.error("Failed to load data. Please check your API configuration.")
-                return
+                st.session_state.activity_codes = None
+            st.session_state.data_loaded = True
+            st.session_state.last_refresh = datetime.now()
         
         # Get data from session state
         users_df = st.session_state.users_data
         usage_df = st.session_state.usage_data
         
+        # The processor's analytics read its own frames, which only process_* calls set
+        self.data_processor.users_df = users_df
+        self.data_processor.usage_df = usage_df
+        
         if users_df is None or usage_df is None or usage_df.empty:
             st.error("No data available. Please refresh to try again.")
             return
         
+        # Count rows once; the render methods and their fragment reruns check these instead of the frames
+        daily_df = st.session_state.daily_usage_df
+        self.users_rows = len(users_df)
+        self.usage_rows = len(usage_df)
+        self.daily_rows = 0 if daily_df is None else len(daily_df)
+        
         # Apply filters
-        if filters['activity_filter'] != "All" and 'activity_level' in users_df.columns:
-            filtered_users = users_df[users_df['activity_level'] == filters['activity_filter']]
-            usage_df = usage_df[usage_df['user_id'].isin(filtered_users['id'])]
+        user_model_view = st.session_state.events_by_user_model
+        spending_view = st.session_state.spending_agg
+        activity_codes = st.session_state.activity_codes
+        if filters['activity_filter'] != "All" and activity_codes is not None:
+            level = activity_codes['categories'].get_indexer([filters['activity_filter']])[0]
+            usage_df = usage_df[(activity_codes['usage'] == level) & (level >= 0)]
+            
+            # Narrow the event-level frames to the same users before any renderer scans them
+            if user_model_view is not None and activity_codes['user_model'] is not None:
+                user_model_view = user_model_view[(activity_codes['user_model'] == level) & (level >= 0)]
+            if spending_view is not None and activity_codes['spending'] is not None:
+                spending_view = spending_view[(activity_codes['spending'] == level) & (level >= 0)]
+        
+        st.session_state.events_by_user_model_view = user_model_view
+        st.session_state.spending_agg_view = spending_view
         
         # Render main dashboard components
         st.markdown("---")
@@ -1197,12 +1453,9 @@ class CursorDashboard:
         
         with col1:
             st.subheader("🏆 Top Users")
-            metric_choice = st.selectbox(
-                "Rank by:",
-                ["total_requests", "total_sessions", "total_tokens", "activity_score"],
-                format_func=lambda x: x.replace('_', ' ').title()
-            )
-            self.render_top_users_chart(usage_df, metric_choice)
+            # The per-metric top rows from load time only hold for the unfiltered users
+            top_users_by_metric = st.session_state.top_users_by_metric if filters['activity_filter'] == "All" else None
+            self.render_top_users_chart(usage_df, top_users_by_metric=top_users_by_metric)
         
         with col2:
             if filters['show_feature_breakdown']:
@@ -1216,7 +1469,7 @@ class CursorDashboard:
             
             # Get org usage for trends
             if self.api_client:
-                org_usage = self.api_client.get_organization_usage()
+                org_usage = fetch_organization_usage(self.api_client)
                 self.render_usage_trends_chart(org_usage)
         
         # User segmentation
@@ -27,6 +27,9 @@ REFRESH_INTERVAL_MINUTES=30
 # Maximum number of users to fetch per API request
 MAX_USERS_PER_REQUEST=100
 
+# Maximum number of API requests in flight at once (calls still start at most once per second)
+MAX_CONCURRENT_REQUESTS=4
+
 # How long to keep data for analysis (in days)
 DATA_RETENTION_DAYS=90
 
@@ -5,6 +5,7 @@ Test script to verify Cursor API credentials and connection
 
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Add backend to path
@@ -42,9 +43,20 @@ def test_api_connection():
             base_url=Config.CURSOR_API_BASE_URL
         )
         
+        # The endpoint checks are independent round-trips, so start them all at once
+        executor = ThreadPoolExecutor(max_workers=5)
+        futures = {
+            'members': executor.submit(api_client.get_team_members),
+            'daily_usage': executor.submit(api_client.get_daily_usage_data),
+            'usage_events': executor.submit(api_client.get_usage_events, page_size=5),
+            'spending': executor.submit(api_client.get_spending_data),
+            'org_info': executor.submit(api_client.get_organization_info)
+        }
+        executor.shutdown(wait=False)
+        
         # Test team members endpoint
         print("👥 Testing team members endpoint...")
-        members = api_client.get_team_members()
+        members = futures['members'].result()
         print(f"   ✅ Found {len(members)} team members")
         
         if members:
@@ -54,7 +66,7 @@ def test_api_connection():
         
         # Test daily usage data
         print("\n📊 Testing daily usage data...")
-        daily_usage = api_client.get_daily_usage_data()
+        daily_usage = futures['daily_usage'].result()
         print(f"   ✅ Daily usage data retrieved")
         data_points = daily_usage.get('data', [])
         print(f"   📈 Data points available: {len(data_points)}")
@@ -64,7 +76,7 @@ def test_api_connection():
         
         # Test usage events
         print("\n📋 Testing usage events...")
-        usage_events = api_client.get_usage_events(page_size=5)
+        usage_events = futures['usage_events'].result()
         print(f"   ✅ Usage events retrieved")
         events = usage_events.get('usageEvents', [])
         print(f"   📊 Events available: {len(events)}")
@@ -72,14 +84,14 @@ def test_api_connection():
         
         # Test spending data
         print("\n💰 Testing spending data...")
-        spending_data = api_client.get_spending_data()
+        spending_data = futures['spending'].result()
         print(f"   ✅ Spending data retrieved")
         total_spent = spending_data.get('totalSpent', 0)
         print(f"   💵 Total spent: ${total_spent:.2f}")
         
         # Test organization info (derived from team members)
         print("\n🏢 Testing organization info...")
-        org_info = api_client.get_organization_info()
+        org_info = futures['org_info'].result()
         print(f"   ✅ Organization: {org_info.get('name', 'Unknown')}")
         print(f"   ✅ Organization ID: {org_info.get('id', 'Unknown')}")
         print(f"   ✅ Plan: {org_info.get('plan', 'Unknown')}")
@@ -9,6 +9,7 @@ import os
 import json
 from datetime import datetime, timedelta
 import pandas as pd
+import numpy as np
 
 # Add backend to path
 sys.path.append('backend')
@@ -17,62 +18,70 @@ from data_processor import DataProcessor
 from storage import DataStorage
 from config import Config
 
-def generate_demo_data():
+rng = np.random.default_rng()
+
+def generate_demo_data(n_users=20):
     """Generate comprehensive demo data for testing"""
     print("Generating demo data...")
     
+    now = datetime.now()
+    
     # Generate users data
     users_data = []
-    for i in range(20):
+    for i in range(n_users):
         user = {
             'id': f'demo_user_{i+1}',
             'email': f'user{i+1}@company.com',
             'name': f'Demo User {i+1}',
             'role': ['developer', 'admin', 'viewer'][i % 3],
             'status': 'active' if i < 18 else 'inactive',
-            'created_at': (datetime.now() - timedelta(days=30 + i*10)).isoformat(),
-            'last_active': (datetime.now() - timedelta(days=i)).isoformat(),
+            'created_at': (now - timedelta(days=30 + (i % 100)*10)).isoformat(),
+            'last_active': (now - timedelta(days=i % 365)).isoformat(),
             'subscription_type': ['pro', 'team', 'enterprise'][i % 3]
         }
         users_data.append(user)
     
+    # Vary usage based on user index for realistic distribution, drawing every metric in one batch
+    base_activity = 100 - np.arange(1, n_users + 1) * 3
+    metrics = {
+        'total_sessions': np.maximum(10, base_activity + random_variance(30, n_users)),
+        'total_requests': np.maximum(50, base_activity * 10 + random_variance(200, n_users)),
+        'total_tokens': np.maximum(1000, base_activity * 100 + random_variance(5000, n_users)),
+        'unique_days_active': np.clip(base_activity // 5, 5, 30),
+        'avg_session_duration': np.maximum(15, 60 + random_variance(30, n_users))
+    }
+    feature_usage = {
+        'code_completion': np.maximum(10, base_activity * 2 + random_variance(50, n_users)),
+        'chat': np.maximum(5, base_activity // 2 + random_variance(20, n_users)),
+        'diff': np.maximum(1, base_activity // 5 + random_variance(10, n_users)),
+        'search': np.maximum(10, base_activity + random_variance(30, n_users)),
+        'refactor': np.maximum(1, base_activity // 10 + random_variance(5, n_users)),
+        'debug': np.maximum(2, base_activity // 3 + random_variance(10, n_users))
+    }
+    
+    # Convert to plain ints once so the records stay JSON serialisable
+    metric_rows = [dict(zip(metrics, row)) for row in zip(*(values.tolist() for values in metrics.values()))]
+    feature_rows = [dict(zip(feature_usage, row)) for row in zip(*(values.tolist() for values in feature_usage.values()))]
+    
     # Generate usage data
+    period = {
+        'start': (now - timedelta(days=30)).isoformat(),
+        'end': now.isoformat()
+    }
     usage_data = {}
-    for user in users_data:
+    for user, user_metrics, user_features in zip(users_data, metric_rows, feature_rows):
         user_id = user['id']
-        
-        # Vary usage based on user index for realistic distribution
-        base_activity = 100 - (int(user_id.split('_')[-1]) * 3)
-        
         usage_data[user_id] = {
             'user_id': user_id,
-            'period': {
-                'start': (datetime.now() - timedelta(days=30)).isoformat(),
-                'end': datetime.now().isoformat()
-            },
-            'metrics': {
-                'total_sessions': max(10, base_activity + random_variance(30)),
-                'total_requests': max(50, (base_activity * 10) + random_variance(200)),
-                'total_tokens': max(1000, (base_activity * 100) + random_variance(5000)),
-                'unique_days_active': max(5, min(30, base_activity // 5)),
-                'avg_session_duration': max(15, 60 + random_variance(30)),
-                'feature_usage': {
-                    'code_completion': max(10, base_activity * 2 + random_variance(50)),
-                    'chat': max(5, base_activity // 2 + random_variance(20)),
-                    'diff': max(1, base_activity // 5 + random_variance(10)),
-                    'search': max(10, base_activity + random_variance(30)),
-                    'refactor': max(1, base_activity // 10 + random_variance(5)),
-                    'debug': max(2, base_activity // 3 + random_variance(10))
-                }
-            }
+            'period': dict(period),
+            'metrics': {**user_metrics, 'feature_usage': user_features}
         }
     
     return users_data, usage_data
 
-def random_variance(base_value):
-    """Add random variance to a base value"""
-    import random
-    return random.randint(-base_value//4, base_value//4)
+def random_variance(base_value, size):
+    """Draw random variances of up to a quarter of the base value in either direction"""
+    return rng.integers(-base_value//4, base_value//4, size=size, endpoint=True)
 
 def test_data_processing():
     """Test data processing functionality"""
@@ -251,19 +260,17 @@ def show_file_structure():
             return
         
         try:
-            items = sorted(os.listdir(path))
-            for i, item in enumerate(items):
-                if item.startswith('.'):
-                    continue
-                    
-                item_path = os.path.join(path, item)
-                is_last = i == len(items) - 1
+            # scandir entries carry their file type from the directory read, so no stat per entry
+            with os.scandir(path) as it:
+                entries = sorted((entry for entry in it if not entry.name.startswith('.')), key=lambda entry: entry.name)
+            for i, entry in enumerate(entries):
+                is_last = i == len(entries) - 1
                 current_prefix = "└── " if is_last else "├── "
-                print(f"{prefix}{current_prefix}{item}")
+                print(f"{prefix}{current_prefix}{entry.name}")
                 
-                if os.path.isdir(item_path) and not item.startswith('.'):
+                if entry.is_dir():
                     next_prefix = prefix + ("    " if is_last else "│   ")
-                    print_tree(item_path, next_prefix, max_depth, current_depth + 1)
+                    print_tree(entry.path, next_prefix, max_depth, current_depth + 1)
         except PermissionError:
             pass
     